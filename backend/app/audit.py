@@ -0,0 +1,168 @@
+"""Write-behind audit trail of changes made through the API.
+
+Handlers call ``audit_log.record(...)`` after their commit. The event goes
+into a bounded in-process queue, and a background task writes queued events
+with one multi-row INSERT per batch (every AUDIT_BATCH_SIZE events or
+AUDIT_FLUSH_INTERVAL seconds, whichever comes first), so a write pays no
+extra database round trip. When the database falls behind and the queue
+fills up, ``record`` waits up to AUDIT_ENQUEUE_TIMEOUT for room before
+dropping the event (counted in ``audit_events_total{outcome="dropped"}``).
+Shutdown drains the queue. Events still queued when the process dies are lost.
+"""
+import asyncio
+import contextvars
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+
+from .database import SessionLocal
+from .metrics import Counter, Gauge, Histogram, QUERY_BUCKETS, registry
+from .models import AuditEvent
+
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() not in ("0", "false", "no")
+# Events buffered in memory before record() starts applying backpressure
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+# Rows per INSERT, and the longest an event waits for its batch to fill
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+# How long a handler waits for queue space before the event is dropped
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.5"))
+# Attempts per batch before it is dropped, and how long shutdown may spend draining
+AUDIT_FLUSH_ATTEMPTS = int(os.getenv("AUDIT_FLUSH_ATTEMPTS", "3"))
+AUDIT_SHUTDOWN_TIMEOUT = float(os.getenv("AUDIT_SHUTDOWN_TIMEOUT", "10"))
+
+audit_events_total = registry.register(Counter(
+    "audit_events_total", "Audit events by outcome (written or dropped).", ("outcome",)))
+audit_flush_duration = registry.register(Histogram(
+    "audit_flush_duration_seconds", "Time to write one batch of audit events.", QUERY_BUCKETS))
+
+
+class AuditLog:
+    """Bounded queue of audit events plus the background task that writes them in batches."""
+
+    def __init__(self, queue_size: int = AUDIT_QUEUE_SIZE, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL, enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT,
+                 enabled: bool = AUDIT_ENABLED):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None  # Set when events are queued
+        self._full: Optional[asyncio.Event] = None  # Set when a whole batch is waiting (or on shutdown)
+        self._closing = False
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the flusher on the running loop (idempotent; record() also starts it on first use)."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._wakeup = asyncio.Event()
+            self._full = asyncio.Event()
+        self._closing = False
+        # Fresh context: when started lazily from a handler, the flusher must not inherit that request's
+        # per-request state (query counters, profiling route)
+        self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def record(self, principal, action: str, entity: str, entity_id: Optional[int] = None,
+                     changes: Optional[dict] = None):
+        """Queue an audit event for ``principal`` (a Principal or None); call after the change is committed."""
+        if not self.enabled:
+            return
+        if self._closing:
+            audit_events_total.inc("dropped")
+            return
+        self.start()
+        event = {
+            "actor_id": principal.id if principal is not None else None,
+            "actor": principal.username if principal is not None else None,
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "changes": jsonable_encoder(changes) if changes is not None else None,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Backpressure: slow this request down while the flusher catches up, but never stall it for long
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                audit_events_total.inc("dropped")
+                return
+        self._wakeup.set()
+        if self._queue.qsize() >= self.batch_size:
+            self._full.set()
+
+    def _drain(self) -> List[dict]:
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            if self._queue.empty():
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self._queue.qsize() < self.batch_size and not self._closing:
+                # Let more events arrive so they share one multi-row INSERT
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            await self._flush(self._drain())
+
+    async def _flush(self, batch: List[dict]):
+        delay = 0.5
+        for attempt in range(1, AUDIT_FLUSH_ATTEMPTS + 1):
+            start = time.perf_counter()
+            try:
+                async with SessionLocal() as db:
+                    await db.execute(insert(AuditEvent), batch)
+                    await db.commit()
+            except Exception as e:
+                if attempt == AUDIT_FLUSH_ATTEMPTS:
+                    audit_events_total.inc("dropped", amount=len(batch))
+                    print(f"⚠️  Dropped {len(batch)} audit events after {attempt} attempts: {e}")
+                    return
+                await asyncio.sleep(delay)
+                delay *= 2
+            else:
+                audit_flush_duration.observe(time.perf_counter() - start)
+                audit_events_total.inc("written", amount=len(batch))
+                return
+
+    async def stop(self):
+        """Write out everything still queued, then stop the flusher."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        self._full.set()
+        try:
+            await asyncio.wait_for(self._task, AUDIT_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            lost = self.depth()
+            audit_events_total.inc("dropped", amount=lost)
+            print(f"⚠️  Audit flush did not finish within {AUDIT_SHUTDOWN_TIMEOUT}s; {lost} events dropped")
+        self._task = None
+
+
+audit_log = AuditLog()
+registry.register(Gauge("audit_queue_depth", "Audit events waiting to be written.", audit_log.depth))
@@ -1,15 +1,21 @@
 import os
+import json
+import asyncio
 import jwt
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, event, inspect
+from sqlalchemy.orm import Session, object_session
 from dotenv import load_dotenv
 
-from .database import get_db
+from .database import SessionLocal
 from .models import User
+from .cache import TTLCache, create_shared_store, run_soon
 
 load_dotenv()
 
@@ -20,12 +26,94 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 
-# Password hashing functions
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Password hashing configuration
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # thread or process
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+DEFAULT_CANDIDATE_PASSWORD = "candidate123"
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once and at most ``max_queue`` more may
+    wait for a worker; anything beyond that is rejected with a 503 instead of
+    piling up behind a burst of logins.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_queue: int, executor: str = "thread"):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor_kind = executor
+        self._executor = None
+        self._pending = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.workers + self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hashpw, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_checkpw, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        try:
+            return int(hashed_password.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_EXECUTOR)
+_default_candidate_password_hash: Optional[str] = None
+
+# Password hashing functions
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return password_hasher.needs_rehash(hashed_password)
+
+async def get_default_candidate_password_hash() -> str:
+    # Hashed once per process (and per cost factor) instead of on every candidate registration
+    global _default_candidate_password_hash
+    if _default_candidate_password_hash is None or password_needs_rehash(_default_candidate_password_hash):
+        _default_candidate_password_hash = await get_password_hash(DEFAULT_CANDIDATE_PASSWORD)
+    return _default_candidate_password_hash
 
 # JWT token functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -38,31 +126,181 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+# Authenticated-principal cache configuration
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_LOCAL_TTL = float(os.getenv("PRINCIPAL_CACHE_LOCAL_TTL", "5"))
+PRINCIPAL_CACHE_URL = os.getenv("PRINCIPAL_CACHE_URL")  # e.g. redis://localhost:6379/0 or memory://
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user, safe to share between requests."""
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    is_active: bool
+    is_admin: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
+        )
+
+    def to_json(self) -> bytes:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return json.dumps(data).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "Principal":
+        data = json.loads(raw)
+        if data["created_at"]:
+            data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+class PrincipalCache:
+    """TTL+LRU cache of resolved principals keyed by token subject (username).
+
+    With a shared store configured, the store is authoritative and the local
+    LRU only holds entries for PRINCIPAL_CACHE_LOCAL_TTL seconds, which bounds
+    how long another worker can serve a principal after it was invalidated.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, shared_store=None, local_ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.shared_store = shared_store
+        local_ttl = min(ttl, local_ttl) if shared_store is not None and local_ttl is not None else ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=local_ttl)
+        self.shared_hits = 0
+        self.shared_misses = 0
+        # Bumped by every invalidation; a lookup that raced with one must not re-cache what it read
+        self.generation = 0
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return f"principal:{username}"
+
+    async def get(self, username: str) -> Optional[Principal]:
+        principal = self.local.get(username)
+        if principal is not None or self.shared_store is None:
+            return principal
+        raw = await self.shared_store.get(self._key(username))
+        if raw is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        principal = Principal.from_json(raw)
+        self.local.set(username, principal)
+        return principal
+
+    async def set(self, principal: Principal, generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            return
+        self.local.set(principal.username, principal)
+        if self.shared_store is not None:
+            await self.shared_store.set(self._key(principal.username), principal.to_json(), self.ttl)
+
+    def invalidate(self, username: str):
+        self.generation += 1
+        self.local.delete(username)
+        if self.shared_store is not None:
+            run_soon(self.shared_store.delete(self._key(username)))
+
+    def clear(self):
+        self.local.clear()
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats["ttl"] = self.ttl
+        if self.shared_store is not None:
+            stats["shared_hits"] = self.shared_hits
+            stats["shared_misses"] = self.shared_misses
+        return stats
+
+principal_cache = PrincipalCache(
+    PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, create_shared_store(PRINCIPAL_CACHE_URL), PRINCIPAL_CACHE_LOCAL_TTL
+)
+
+def invalidate_principal(username: str):
+    """Drop a cached principal.
+
+    ORM updates and deletes of users do this on commit. Core ``update(User)`` /
+    ``delete(User)`` statements bypass the mapper events, so code issuing them
+    must call this for every affected username after committing.
+    """
+    principal_cache.invalidate(username)
+
+_STALE_PRINCIPALS = "stale_principals"
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_stale_principal(mapper, connection, target):
+    # Runs at flush, before the transaction commits: invalidating now would let a concurrent
+    # request re-read the old row and cache it again, so only note the usernames (old ones too)
+    stale = object_session(target).info.setdefault(_STALE_PRINCIPALS, set())
+    stale.add(target.username)
+    stale.update(inspect(target).attrs.username.history.deleted or ())
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_principals(session):
+    for username in session.info.pop(_STALE_PRINCIPALS, ()):
+        invalidate_principal(username)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_principals(session):
+    session.info.pop(_STALE_PRINCIPALS, None)
+
+async def resolve_principal(token: str) -> Optional[Principal]:
+    """The principal a bearer token belongs to, or None if the token or its user is invalid."""
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
-        raise credentials_exception
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    
+    principal = await principal_cache.get(username)
+    if principal is not None:
+        return principal
+    generation = principal_cache.generation
     
-    user = db.query(User).filter(User.username == username).first()
+    # Own short-lived primary session: the connection goes back to the pool before the
+    # handler runs, instead of being pinned next to a read-replica session for the whole request
+    async with SessionLocal() as db:
+        result = await db.execute(select(User).filter(User.username == username))
+        user = result.scalars().first()
     if user is None:
-        raise credentials_exception
-    return user
+        return None
+    principal = Principal.from_user(user)
+    await principal_cache.set(principal, generation)
+    return principal
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    principal = await resolve_principal(credentials.credentials)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+def get_current_active_user(current_user: Principal = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,88 @@
+"""Set-based bulk updates for the ``/bulk`` endpoints.
+
+Targets are given as an id list or as filter criteria. Each chunk of up to
+BULK_UPDATE_CHUNK_SIZE rows costs one SELECT (locking the rows and reading
+the values the dashboard counters depend on) and one ``UPDATE ... WHERE id
+IN (...)``. The whole run commits once. Core updates bypass the ORM mapper
+events, so the counters are adjusted here. Callers still invalidate their
+caches with the returned ids.
+"""
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+
+from .stats import TRACKED_ATTRIBUTES, record_updates
+
+# Rows per SELECT/UPDATE round trip, and the most ids one request may list
+BULK_UPDATE_CHUNK_SIZE = int(os.getenv("BULK_UPDATE_CHUNK_SIZE", "1000"))
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "10000"))
+
+
+def check_targets(ids: Optional[List[int]], criteria: Sequence) -> None:
+    """Require exactly one way of choosing rows, so an empty body can never update a whole table."""
+    if ids is None and not criteria:
+        raise HTTPException(status_code=400, detail="Give ids or at least one filter")
+    if ids is not None and criteria:
+        raise HTTPException(status_code=400, detail="Give either ids or filters, not both")
+    if ids is not None and len(ids) > BULK_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_IDS} ids per request")
+
+
+async def bulk_update(db, model, values: dict, ids: Optional[List[int]] = None,
+                      criteria: Sequence = ()) -> Tuple[dict, List[int]]:
+    """Set ``values`` on the rows of ``model`` chosen by ``ids`` or ``criteria``, in one transaction.
+
+    Rows that already hold ``values`` are left alone. Returns the report
+    (``updated``, ``unchanged``, ``not_found`` ids) and the updated ids.
+    """
+    tracked = tuple(dict.fromkeys(TRACKED_ATTRIBUTES.get(model, ()) + tuple(values)))
+    columns = [model.id] + [getattr(model, name) for name in tracked]
+    report = {"updated": 0, "unchanged": 0, "not_found": []}
+    updated_ids: List[int] = []
+
+    async def apply(rows):
+        rows = [row._asdict() for row in rows]
+        changed = [row for row in rows if any(row[name] != value for name, value in values.items())]
+        report["unchanged"] += len(rows) - len(changed)
+        if not changed:
+            return
+        chunk_ids = [row["id"] for row in changed]
+        await db.execute(
+            update(model).where(model.id.in_(chunk_ids)).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+        if model in TRACKED_ATTRIBUTES:
+            await record_updates(db, model, changed, values)
+        report["updated"] += len(changed)
+        updated_ids.extend(chunk_ids)
+
+    try:
+        if ids is not None:
+            ids = list(dict.fromkeys(ids))
+            for start in range(0, len(ids), BULK_UPDATE_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_UPDATE_CHUNK_SIZE]
+                result = await db.execute(select(*columns).where(model.id.in_(chunk)).with_for_update())
+                rows = result.all()
+                found = {row.id for row in rows}
+                report["not_found"].extend(id for id in chunk if id not in found)
+                await apply(rows)
+        else:
+            # Walk the matches in id order; updated rows may stop matching, so seek by id rather than offset
+            last_id = 0
+            while True:
+                result = await db.execute(
+                    select(*columns).where(*criteria, model.id > last_id)
+                    .order_by(model.id).limit(BULK_UPDATE_CHUNK_SIZE).with_for_update()
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                await apply(rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return report, updated_ids
@@ -0,0 +1,139 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class MemoryStore:
+    """Local stand-in for a shared key/value store (same API as RedisStore).
+
+    Useful for single-worker deployments and tests; values only live in this process.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Add ``amount`` to an integer counter, creating it with ``ttl`` if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None or (entry[0] is not None and entry[0] < time.monotonic()):
+            entry = (time.monotonic() + ttl if ttl else None, b"0")
+        value = int(entry[1]) + amount
+        self._data[key] = (entry[0], str(value).encode())
+        return value
+
+
+class RedisStore:
+    """Shared key/value store backed by Redis, for multi-worker deployments."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("The 'redis' package is required for redis:// cache URLs") from e
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        await self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def delete(self, key: str):
+        await self._client.delete(key)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.incrby(key, amount)
+            if ttl:
+                # NX: only the first increment sets the expiry, so a busy counter still expires
+                pipe.pexpire(key, int(ttl * 1000), nx=True)
+            results = await pipe.execute()
+        return int(results[0])
+
+
+def create_shared_store(url: Optional[str]):
+    """Build a shared store from a URL: ``redis://...``, ``memory://`` or empty for none."""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+_background_tasks = set()
+
+
+def run_soon(coro):
+    """Schedule a coroutine from sync code (e.g. ORM event hooks) if a loop is running."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        coro.close()
+        return None
+    task = loop.create_task(coro)
+    # Keep a reference until done so the task isn't garbage collected mid-flight
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
@@ -0,0 +1,128 @@
+import os
+import gzip
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Responses smaller than this are sent uncompressed (the framing overhead isn't worth it)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# Compressed bodies of responses with an ETag are reused (e.g. cached catalog pages)
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0 exclusions."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    wildcard = offered.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing single-chunk JSON/text responses with brotli or gzip.
+
+    Streaming responses (exports) pass through untouched so they are never
+    buffered. A compressed response's strong ETag becomes weak, since the
+    bytes differ from the identity representation.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, cache_size: int = COMPRESSION_CACHE_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+    def _compress(self, body: bytes, encoding: str, etag: Optional[bytes]) -> bytes:
+        if etag is None or self.cache_size <= 0:
+            return compress(body, encoding)
+        key = (etag, encoding)
+        compressed = self._cache.get(key)
+        if compressed is None:
+            compressed = self._cache[key] = compress(body, encoding)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return compressed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if b"content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    return await send(message)
+                start_message = message
+                return
+            # First body message: only a complete (single-chunk) body is compressed
+            body = message.get("body", b"")
+            headers = [(name, value) for name, value in start_message.get("headers", []) if name.lower() != b"vary"]
+            vary = [value for name, value in start_message.get("headers", []) if name.lower() == b"vary"]
+            vary_value = b", ".join(vary + [b"Accept-Encoding"])
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                start_message["headers"] = headers + [(b"vary", vary_value)]
+                await send(start_message)
+                return await send(message)
+            etag = next((value for name, value in headers if name.lower() == b"etag"), None)
+            compressed = self._compress(body, encoding, etag)
+            headers = [
+                (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+                for name, value in headers if name.lower() != b"content-length"
+            ]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary_value),
+            ]
+            start_message["headers"] = headers
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,260 @@
+"""Duplicate-candidate detection behind ``/candidates/duplicates``.
+
+The same student often turns up twice, with a new email and the phone
+number written differently. Comparing every pair of candidates does not
+scale, so each candidate gets two blocking keys at write time:
+
+* ``name_key``: the name case- and accent-folded, without punctuation or
+  honorifics, tokens sorted ("Kumar, Ravi" and "ravi  kumar" -> "kumar ravi")
+* ``phone_key``: the last 10 digits of the phone ("+91 98765-43210" and
+  "098765 43210" -> "9876543210")
+
+Only candidates sharing a key are compared. Blocks larger than
+DEDUP_MAX_BLOCK_SIZE (a very common name, a shared office number) carry too
+little signal to be worth comparing and are skipped. A mapper event derives
+the keys on every ORM insert/update; Core bulk inserts should add
+``derived_candidate_values``. Existing rows are backfilled by migration 0005,
+or again after a change to the normalization:
+
+    python -m app.dedup backfill
+"""
+import asyncio
+import os
+import re
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations, groupby
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, or_, select, update
+
+from .models import Candidate
+
+# Candidates sharing one key beyond which the key is ignored
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv("DEDUP_MAX_BLOCK_SIZE", "50"))
+# Lowest pair score reported by /candidates/duplicates by default, and the score that triggers the insert warning
+DEDUP_MIN_SCORE = float(os.getenv("DEDUP_MIN_SCORE", "0.45"))
+DEDUP_WARN_SCORE = float(os.getenv("DEDUP_WARN_SCORE", "0.45"))
+
+# Set on POST /candidates/ responses when the new candidate looks like existing ones
+POSSIBLE_DUPLICATES_HEADER = "X-Possible-Duplicates"
+
+# Score weights: a matching phone is the strongest evidence; name and email similarity add to it.
+# At the default threshold a shared phone is enough, while a shared name also needs a similar email.
+PHONE_WEIGHT = 0.5
+NAME_WEIGHT = 0.4
+EMAIL_WEIGHT = 0.1
+
+_HONORIFICS = {"mr", "mrs", "ms", "miss", "dr", "prof", "shri", "sri", "smt", "kumari"}
+_NON_WORD = re.compile(r"[^\w\s]|_")
+_NON_DIGIT = re.compile(r"\D")
+PHONE_KEY_DIGITS = 10
+MIN_PHONE_DIGITS = 7
+
+
+def name_key(name: Optional[str]) -> Optional[str]:
+    """Blocking key for a person's name; None when nothing is left after folding."""
+    if not name:
+        return None
+    folded = unicodedata.normalize("NFKD", name.casefold())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    tokens = [token for token in _NON_WORD.sub(" ", folded).split() if token not in _HONORIFICS]
+    return " ".join(sorted(tokens)) or None
+
+
+def phone_key(phone: Optional[str]) -> Optional[str]:
+    """Blocking key for a phone number (its last 10 digits); None when it has too few digits to mean anything."""
+    if not phone:
+        return None
+    digits = _NON_DIGIT.sub("", phone)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def email_local(email: Optional[str]) -> str:
+    """The part of an email a person picks: local part without "+tag", dots or separators."""
+    local = (email or "").casefold().split("@")[0].split("+")[0]
+    return _NON_WORD.sub("", local)
+
+
+def derived_candidate_values(name: Optional[str], phone: Optional[str]) -> dict:
+    """Column values derived from a candidate's name and phone."""
+    return {"name_key": name_key(name), "phone_key": phone_key(phone)}
+
+
+@event.listens_for(Candidate, "before_insert")
+@event.listens_for(Candidate, "before_update")
+def _derive(mapper, connection, target):
+    for key, value in derived_candidate_values(target.name, target.phone).items():
+        setattr(target, key, value)
+
+
+def _similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    return 1.0 if a == b else SequenceMatcher(None, a, b).ratio()
+
+
+def match_score(a, b) -> Tuple[float, List[str]]:
+    """Score in [0, 1] that candidates ``a`` and ``b`` are the same person, with the reasons behind it."""
+    reasons = []
+    score = 0.0
+    if a.phone_key is not None and a.phone_key == b.phone_key:
+        score += PHONE_WEIGHT
+        reasons.append("phone")
+    name_similarity = _similarity(a.name_key or "", b.name_key or "")
+    if name_similarity == 1.0:
+        reasons.append("name")
+    elif name_similarity >= 0.8:
+        reasons.append("similar_name")
+    score += NAME_WEIGHT * name_similarity
+    # Only a clearly similar email counts; partial overlap (shared digits, a common first name) is noise
+    if _similarity(email_local(a.email), email_local(b.email)) >= 0.8:
+        reasons.append("similar_email")
+        score += EMAIL_WEIGHT
+    return round(score, 3), reasons
+
+
+# Candidate columns the matcher reads; full rows are loaded only for reported groups
+_MATCH_COLUMNS = (Candidate.id, Candidate.email, Candidate.name_key, Candidate.phone_key)
+_KEYS_PER_QUERY = 500
+
+
+async def _blocks(db, key_column, max_block_size: int) -> Tuple[List[list], int]:
+    """Candidates grouped by a shared ``key_column`` value, and how many blocks were too large to compare."""
+    # One index-only GROUP BY finds the shared keys; only their members are read
+    result = await db.execute(
+        select(key_column, func.count()).where(key_column.isnot(None))
+        .group_by(key_column).having(func.count() > 1)
+    )
+    sizes = result.all()
+    keys = [key for key, size in sizes if size <= max_block_size]
+    blocks = []
+    for start in range(0, len(keys), _KEYS_PER_QUERY):
+        result = await db.execute(
+            select(*_MATCH_COLUMNS).where(key_column.in_(keys[start:start + _KEYS_PER_QUERY]))
+            .order_by(key_column, Candidate.id)
+        )
+        blocks += [list(block) for _, block in groupby(result.all(), key=lambda row: getattr(row, key_column.key))]
+    return blocks, len(sizes) - len(keys)
+
+
+async def find_duplicates(db, min_score: float = DEDUP_MIN_SCORE,
+                          max_block_size: int = DEDUP_MAX_BLOCK_SIZE) -> Tuple[list, int]:
+    """Groups of likely duplicate candidates, best first, plus how many oversized blocks were skipped.
+
+    Pairs scoring at least ``min_score`` are linked, and linked candidates form
+    one group (A~B and B~C put A, B and C together). Each group is
+    ``{"score", "reasons", "candidates"}`` with its best pair's score.
+    """
+    pairs: Dict[Tuple[int, int], Tuple[float, List[str]]] = {}
+    skipped = 0
+    for key_column in (Candidate.phone_key, Candidate.name_key):
+        blocks, oversized = await _blocks(db, key_column, max_block_size)
+        skipped += oversized
+        for block in blocks:
+            for a, b in combinations(block, 2):
+                if (a.id, b.id) not in pairs:  # Pairs sharing both keys are scored in the phone pass
+                    pairs[(a.id, b.id)] = match_score(a, b)
+    linked = {pair: match for pair, match in pairs.items() if match[0] >= min_score}
+
+    # Union-find over the linked pairs, so transitive matches end up in one group
+    parent = {id: id for pair in linked for id in pair}
+
+    def root(id):
+        while parent[id] != id:
+            parent[id] = parent[parent[id]]
+            id = parent[id]
+        return id
+
+    for a, b in linked:
+        parent[root(a)] = root(b)
+    groups: Dict[int, dict] = {}
+    for (a, b), (score, reasons) in linked.items():
+        group = groups.setdefault(root(a), {"score": 0.0, "reasons": [], "ids": set()})
+        group["score"] = max(group["score"], score)
+        group["reasons"] += [reason for reason in reasons if reason not in group["reasons"]]
+        group["ids"].update((a, b))
+
+    candidates = {}
+    ids = list(parent)
+    for start in range(0, len(ids), _KEYS_PER_QUERY):
+        result = await db.execute(select(Candidate).where(Candidate.id.in_(ids[start:start + _KEYS_PER_QUERY])))
+        candidates.update((candidate.id, candidate) for candidate in result.scalars())
+    report = [
+        {"score": group["score"], "reasons": group["reasons"],
+         "candidates": [candidates[id] for id in sorted(group["ids"]) if id in candidates]}
+        for group in groups.values()
+    ]
+    # A candidate deleted mid-report can leave a group with one member
+    report = [group for group in report if len(group["candidates"]) > 1]
+    report.sort(key=lambda group: (-group["score"], group["candidates"][0].id))
+    return report, skipped
+
+
+async def possible_duplicates(db, name: str, email: Optional[str], phone: Optional[str],
+                              min_score: float = DEDUP_WARN_SCORE, exclude_id: Optional[int] = None) -> List[int]:
+    """Ids of existing candidates that probably are the person described, best match first.
+
+    One indexed lookup on the two blocking keys, so it is cheap enough to run on every insert.
+    """
+    keys = derived_candidate_values(name, phone)
+    criteria = [getattr(Candidate, column) == value for column, value in keys.items() if value is not None]
+    if not criteria:
+        return []
+    stmt = select(Candidate.id, Candidate.email, Candidate.name_key, Candidate.phone_key).where(or_(*criteria))
+    if exclude_id is not None:
+        stmt = stmt.where(Candidate.id != exclude_id)
+    result = await db.execute(stmt.limit(DEDUP_MAX_BLOCK_SIZE * 2))
+    probe = SimpleNamespace(email=email, **keys)
+    matches = []
+    for row in result:
+        score, _ = match_score(probe, row)
+        if score >= min_score:
+            matches.append((-score, row.id))
+    return [id for _, id in sorted(matches)]
+
+
+def backfill_rows(rows):
+    """Derived values for ``(id, name, phone)`` rows, as update parameters."""
+    return [{"candidate_id": id, **derived_candidate_values(name, phone)} for id, name, phone in rows]
+
+
+async def backfill(db, batch_size: int = 1000) -> int:
+    """Recompute the blocking keys of every candidate in batches; returns the number of rows."""
+    stmt = (
+        update(Candidate.__table__)
+        .where(Candidate.__table__.c.id == bindparam("candidate_id"))
+        .values({name: bindparam(name) for name in ("name_key", "phone_key")})
+    )
+    last_id, total = 0, 0
+    while True:
+        result = await db.execute(
+            select(Candidate.id, Candidate.name, Candidate.phone)
+            .where(Candidate.id > last_id).order_by(Candidate.id).limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        await db.execute(stmt, backfill_rows(rows))
+        await db.commit()
+        last_id, total = rows[-1][0], total + len(rows)
+    return total
+
+
+async def _main(argv):
+    from .database import SessionLocal
+
+    if argv[1:] != ["backfill"]:
+        print(__doc__)
+        sys.exit(2)
+    async with SessionLocal() as db:
+        total = await backfill(db)
+    print(f"Backfilled {total} candidates")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv))
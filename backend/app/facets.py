@@ -0,0 +1,209 @@
+"""Structured job attributes behind the ``/jobs`` filters and facet counts.
+
+``salary_range`` stays the free text shown to users ("₹6-10 LPA"); the
+parsed yearly bounds in rupees go into ``salary_min``/``salary_max``, and
+``location_key``/``company_key`` hold case- and whitespace-folded names so
+"pune " and "Pune" filter and count together. A mapper event derives them on
+every ORM insert/update; Core bulk inserts should add ``derived_job_values``.
+Existing rows are backfilled by migration 0003, or again after a parser change:
+
+    python -m app.facets backfill
+"""
+import asyncio
+import re
+import sys
+from typing import Optional, Tuple
+
+from sqlalchemy import bindparam, case, event, func, literal, select, union_all, update
+
+from .models import Job
+
+LAKH = 100_000
+CRORE = 10_000_000
+_UNITS = {"k": 1_000, "l": LAKH, "lpa": LAKH, "lac": LAKH, "lacs": LAKH, "lakh": LAKH, "lakhs": LAKH,
+          "cr": CRORE, "crore": CRORE, "crores": CRORE}
+_AMOUNT = re.compile(r"(\d+(?:\.\d+)?)\s*(lpa|lakhs?|lacs?|crores?|cr|k|l)?\b")
+_MONTHLY = re.compile(r"(/\s*m(onth|o)?\b|\bper\s+month\b|\bp\.?\s?m\.?\b|\bmonthly\b)")
+
+# Salary facet bands by a job's lower bound: (key, inclusive minimum, exclusive maximum) in rupees per year
+SALARY_BANDS = (
+    ("0-3 LPA", 0, 3 * LAKH),
+    ("3-6 LPA", 3 * LAKH, 6 * LAKH),
+    ("6-10 LPA", 6 * LAKH, 10 * LAKH),
+    ("10-20 LPA", 10 * LAKH, 20 * LAKH),
+    ("20+ LPA", 20 * LAKH, None),
+)
+
+
+def normalize_key(value: Optional[str]) -> Optional[str]:
+    """Case- and whitespace-folded form of a location or company name; None when blank."""
+    if value is None:
+        return None
+    key = " ".join(value.split()).casefold()
+    return key or None
+
+
+def parse_salary(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Parse a salary text into yearly ``(min, max)`` rupees, or ``(None, None)`` if it has no amount.
+
+    Handles ranges and single amounts with an optional unit ("₹6-10 LPA", "12 lakh",
+    "₹25,000/month", "1.2 Cr"). A unit on the last amount applies to the ones before
+    it; bare amounts below 100 are read as LPA, larger ones as rupees.
+    """
+    if not text:
+        return None, None
+    text = text.casefold().replace(",", "")
+    amounts = _AMOUNT.findall(text)[:2]
+    if not amounts:
+        return None, None
+    default_unit = amounts[-1][1]
+    values = []
+    for number, unit in amounts:
+        value = float(number)
+        unit = unit or default_unit
+        if unit:
+            value *= _UNITS[unit]
+        elif value < 100:
+            value *= LAKH
+        values.append(value)
+    if _MONTHLY.search(text):
+        values = [value * 12 for value in values]
+    low, high = min(values), max(values)
+    return int(round(low)), int(round(high))
+
+
+def derived_job_values(company: Optional[str], location: Optional[str], salary_range: Optional[str]) -> dict:
+    """Column values derived from a job's free-text fields."""
+    salary_min, salary_max = parse_salary(salary_range)
+    return {
+        "company_key": normalize_key(company),
+        "location_key": normalize_key(location),
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+    }
+
+
+@event.listens_for(Job, "before_insert")
+@event.listens_for(Job, "before_update")
+def _derive(mapper, connection, target):
+    for key, value in derived_job_values(target.company, target.location, target.salary_range).items():
+        setattr(target, key, value)
+
+
+def filter_jobs(stmt, location: Optional[str] = None, company: Optional[str] = None,
+                min_salary: Optional[int] = None, max_salary: Optional[int] = None):
+    """Apply the ``/jobs`` equality and salary range filters to ``stmt``.
+
+    A salary filter matches jobs whose parsed range overlaps it, so "over 8 LPA"
+    includes a "₹6-10 LPA" job; jobs without a parsed salary are left out.
+    """
+    return stmt.filter(*job_criteria(location, company, min_salary, max_salary))
+
+
+def job_criteria(location=None, company=None, min_salary=None, max_salary=None) -> list:
+    """The filter expressions behind ``filter_jobs``."""
+    criteria = []
+    if location is not None:
+        criteria.append(Job.location_key == normalize_key(location))
+    if company is not None:
+        criteria.append(Job.company_key == normalize_key(company))
+    if min_salary is not None:
+        criteria.append(Job.salary_max >= min_salary)
+    if max_salary is not None:
+        criteria.append(Job.salary_min <= max_salary)
+    return criteria
+
+
+def _salary_band():
+    whens = [
+        (Job.salary_min < upper, key) if upper is not None else (Job.salary_min >= lower, key)
+        for key, lower, upper in SALARY_BANDS
+    ]
+    return case(*whens)
+
+
+def facets_query(location: Optional[str] = None, company: Optional[str] = None,
+                 min_salary: Optional[int] = None, max_salary: Optional[int] = None):
+    """One UNION ALL statement counting active jobs per location, company and salary band.
+
+    Each facet applies every filter except its own, so a client filtered to Pune
+    still sees how many jobs the other locations have. Rows are
+    ``(facet, key, label, count)``.
+    """
+    active = Job.is_active == True
+    band = _salary_band()
+    location_facet = (
+        select(literal("location").label("facet"), Job.location_key.label("key"), func.min(Job.location).label("label"), func.count().label("count"))
+        .where(active, Job.location_key.isnot(None), *job_criteria(None, company, min_salary, max_salary))
+        .group_by(Job.location_key)
+    )
+    company_facet = (
+        select(literal("company"), Job.company_key, func.min(Job.company), func.count())
+        .where(active, Job.company_key.isnot(None), *job_criteria(location, None, min_salary, max_salary))
+        .group_by(Job.company_key)
+    )
+    salary_facet = (
+        select(literal("salary"), band.label("key"), band.label("label"), func.count())
+        .where(active, Job.salary_min.isnot(None), *job_criteria(location, company, None, None))
+        .group_by(band)
+    )
+    return union_all(location_facet, company_facet, salary_facet)
+
+
+async def job_facets(db, location: Optional[str] = None, company: Optional[str] = None,
+                     min_salary: Optional[int] = None, max_salary: Optional[int] = None) -> dict:
+    """Facet counts for the active jobs matching the given filters, largest first."""
+    facets = {"location": [], "company": [], "salary": []}
+    result = await db.execute(facets_query(location, company, min_salary, max_salary))
+    for facet, key, label, count in result:
+        facets[facet].append({"key": key, "label": " ".join(label.split()), "count": count})
+    band_order = {key: index for index, (key, _, _) in enumerate(SALARY_BANDS)}
+    facets["location"].sort(key=lambda value: (-value["count"], value["key"]))
+    facets["company"].sort(key=lambda value: (-value["count"], value["key"]))
+    facets["salary"].sort(key=lambda value: band_order[value["key"]])
+    return facets
+
+
+def backfill_rows(rows):
+    """Derived values for ``(id, company, location, salary_range)`` rows, as update parameters."""
+    return [
+        {"job_id": id, **derived_job_values(company, location, salary_range)}
+        for id, company, location, salary_range in rows
+    ]
+
+
+async def backfill(db, batch_size: int = 1000) -> int:
+    """Recompute the derived columns of every job in batches; returns the number of rows."""
+    stmt = (
+        update(Job.__table__)
+        .where(Job.__table__.c.id == bindparam("job_id"))
+        .values({name: bindparam(name) for name in ("company_key", "location_key", "salary_min", "salary_max")})
+    )
+    last_id, total = 0, 0
+    while True:
+        result = await db.execute(
+            select(Job.id, Job.company, Job.location, Job.salary_range)
+            .where(Job.id > last_id).order_by(Job.id).limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        await db.execute(stmt, backfill_rows(rows))
+        await db.commit()
+        last_id, total = rows[-1][0], total + len(rows)
+    return total
+
+
+async def _main(argv):
+    from .database import SessionLocal
+
+    if argv[1:] != ["backfill"]:
+        print(__doc__)
+        sys.exit(2)
+    async with SessionLocal() as db:
+        total = await backfill(db)
+    print(f"Backfilled {total} jobs")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv))
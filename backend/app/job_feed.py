@@ -0,0 +1,172 @@
+"""In-process pub/sub behind ``GET /jobs/stream`` (Server-Sent Events).
+
+Job writes ``publish`` an event. It is serialized once into an SSE frame,
+appended to a bounded replay buffer and offered to every matching
+subscriber. Each subscriber is just a small queue that its connection
+awaits; there are no per-connection timers, because one feed-wide task
+offers heartbeats to all of them. A subscriber whose queue is full (a client
+that stopped reading) is cut off instead of blocking writers or buffering
+without bound. It reconnects with ``Last-Event-ID`` and catches up from the
+replay buffer. Ids carry the feed's boot time, so ids from before a restart,
+or older than the buffer, get a ``reset`` event telling the client to reload
+``GET /jobs/``.
+
+The feed is per process: with several workers, a stream only sees writes
+handled by its own worker.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Set, Tuple
+
+import orjson
+
+from .facets import normalize_key
+from .metrics import Counter, Gauge, registry
+
+# Events kept for Last-Event-ID resume, and frames one slow client may have pending
+JOB_STREAM_REPLAY_SIZE = int(os.getenv("JOB_STREAM_REPLAY_SIZE", "1000"))
+JOB_STREAM_QUEUE_SIZE = int(os.getenv("JOB_STREAM_QUEUE_SIZE", "64"))
+# Seconds between heartbeat comments (keeps proxies from closing idle streams)
+JOB_STREAM_HEARTBEAT = float(os.getenv("JOB_STREAM_HEARTBEAT", "15"))
+# Open streams per worker; further clients get a 503
+JOB_STREAM_MAX_SUBSCRIBERS = int(os.getenv("JOB_STREAM_MAX_SUBSCRIBERS", "5000"))
+# Reconnect delay suggested to EventSource clients, in milliseconds
+JOB_STREAM_RETRY_MS = int(os.getenv("JOB_STREAM_RETRY_MS", "3000"))
+
+job_stream_events = registry.register(Counter(
+    "job_stream_events_total", "Job feed events published, by type.", ("event",)))
+job_stream_disconnects = registry.register(Counter(
+    "job_stream_slow_disconnects_total", "Job feed subscribers cut off for not keeping up."))
+
+HEARTBEAT = b": heartbeat\n\n"
+_CLOSE = object()
+
+
+# Job fields carried by created/updated events (what a job card shows)
+STREAM_FIELDS = ("id", "title", "company", "location", "salary_range", "salary_min", "salary_max", "is_active", "created_at")
+
+
+class Subscriber:
+    __slots__ = ("company_key", "location_key", "queue", "backlog")
+
+    def __init__(self, company: Optional[str], location: Optional[str], queue_size: int):
+        self.company_key = normalize_key(company)
+        self.location_key = normalize_key(location)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Replayed frames (or a reset), captured when subscribing so nothing is sent twice
+        self.backlog: list = []
+
+    def matches(self, company_key: Optional[str], location_key: Optional[str]) -> bool:
+        # Events with unknown keys (e.g. bulk deactivations) go to everyone; clients ignore unknown ids
+        return (
+            (self.company_key is None or company_key is None or company_key == self.company_key)
+            and (self.location_key is None or location_key is None or location_key == self.location_key)
+        )
+
+    def offer(self, frame) -> bool:
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+
+class JobFeed:
+    def __init__(self, replay_size: int = JOB_STREAM_REPLAY_SIZE, queue_size: int = JOB_STREAM_QUEUE_SIZE,
+                 heartbeat: float = JOB_STREAM_HEARTBEAT, max_subscribers: int = JOB_STREAM_MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.boot = str(int(time.time() * 1000))
+        self._seq = 0
+        # (seq, company_key, location_key, frame)
+        self._replay: Deque[Tuple[int, Optional[str], Optional[str], bytes]] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscriber] = set()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: dict, company: Optional[str] = None, location: Optional[str] = None):
+        """Send ``event`` (created, updated, deleted) with ``data`` to matching subscribers; never blocks."""
+        self._seq += 1
+        company_key, location_key = normalize_key(company), normalize_key(location)
+        frame = b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (self.boot.encode(), self._seq, event.encode(), orjson.dumps(data))
+        self._replay.append((self._seq, company_key, location_key, frame))
+        job_stream_events.inc(event)
+        for subscriber in list(self._subscribers):
+            if subscriber.matches(company_key, location_key) and not subscriber.offer(frame):
+                self._cut_off(subscriber)
+
+    def _cut_off(self, subscriber: Subscriber):
+        # The client stopped reading: drop what it has pending and end its stream
+        self._subscribers.discard(subscriber)
+        job_stream_disconnects.inc()
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(_CLOSE)
+
+    def _replay_after(self, last_event_id: Optional[str], subscriber: Subscriber) -> list:
+        """Frames published after ``last_event_id``, or a reset event if the client must reload instead."""
+        if not last_event_id:
+            return []
+        boot, _, seq = last_event_id.partition("-")
+        reset = [b"id: %s-%d\nevent: reset\ndata: {}\n\n" % (self.boot.encode(), self._seq)]
+        if boot != self.boot or not seq.isdigit():
+            return reset
+        seq = int(seq)
+        oldest = self._replay[0][0] if self._replay else self._seq + 1
+        if seq < oldest - 1 or seq > self._seq:
+            return reset
+        return [frame for event_seq, company_key, location_key, frame in self._replay
+                if event_seq > seq and subscriber.matches(company_key, location_key)]
+
+    async def _heartbeats(self):
+        while self._subscribers:
+            await asyncio.sleep(self.heartbeat)
+            for subscriber in list(self._subscribers):
+                # A full queue already has something to send
+                subscriber.offer(HEARTBEAT)
+        self._heartbeat_task = None
+
+    def subscribe(self, company: Optional[str], location: Optional[str],
+                  last_event_id: Optional[str] = None) -> Optional[Subscriber]:
+        """Register a subscriber (None when the worker is at JOB_STREAM_MAX_SUBSCRIBERS)."""
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(company, location, self.queue_size)
+        subscriber.backlog = self._replay_after(last_event_id, subscriber)
+        self._subscribers.add(subscriber)
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeats())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    async def stream(self, subscriber: Subscriber) -> AsyncIterator[bytes]:
+        """SSE body for ``subscriber``: retry hint, any replayed events, then live events and heartbeats."""
+        try:
+            yield b"retry: %d\n\n" % JOB_STREAM_RETRY_MS
+            backlog, subscriber.backlog = subscriber.backlog, []
+            for frame in backlog:
+                yield frame
+            while True:
+                frame = await subscriber.queue.get()
+                if frame is _CLOSE:
+                    return
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def publish_job(event: str, job):
+    """Publish a created/updated/deleted event for an ORM ``job``."""
+    data = {"id": job.id} if event == "deleted" else {name: getattr(job, name) for name in STREAM_FIELDS}
+    job_feed.publish(event, data, job.company, job.location)
+
+
+job_feed = JobFeed()
+registry.register(Gauge("job_stream_subscribers", "Open /jobs/stream connections.", job_feed.subscriber_count))
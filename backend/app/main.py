@@ -1,11 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
 import os
 from dotenv import load_dotenv
-
-from .database import engine, Base
-from .routers import auth, courses, candidates, jobs
+from .database import engine, read_engine, REPLICA_ENABLED, ReadYourWritesMiddleware
+from .auth import password_hasher, principal_cache
+from .response_cache import catalog_cache, RESPONSE_CACHE_URL
+from .pagination import MISSING_IDS_HEADER, NEXT_CURSOR_HEADER
+from .metrics import MetricsMiddleware, Gauge, instrument_engine, registry
+from .routers import auth, courses, candidates, jobs, stats, audit, profiling
+from .readiness import readiness
+from .audit import audit_log
+from .ratelimit import RateLimitMiddleware, create_rate_limiter
+from .compression import CompressionMiddleware
+from .dedup import POSSIBLE_DUPLICATES_HEADER
+from .profiling import PROFILING_ENABLED, PROFILE_ID_HEADER, ProfilingMiddleware, attach_query_log
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +29,11 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Throttle login/registration and public listings per client (inside CORS so 429s stay readable cross-origin)
+rate_limiter = create_rate_limiter()
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,13 +41,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, MISSING_IDS_HEADER, "Retry-After", PROFILE_ID_HEADER, POSSIBLE_DUPLICATES_HEADER],
 )
 
+# br/gzip for JSON responses above COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Route read-only requests to the replica except right after the client wrote; the same marker makes
+# that client bypass the catalog cache, which other workers only hear about every RESPONSE_CACHE_SYNC_INTERVAL
+if REPLICA_ENABLED or RESPONSE_CACHE_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Opt-in cProfile + SQL capture ("X-Profile: 1" from an admin, or PROFILE_SAMPLE_RATE) and the slow-query log
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+attach_query_log(engine)
+if REPLICA_ENABLED:
+    attach_query_log(read_engine)
+
+# Per-route latency/status/query metrics (outermost so it times the whole stack)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if REPLICA_ENABLED:
+    instrument_engine(read_engine, "db_read_pool")
+registry.register(Gauge("principal_cache_hits", "Principal cache hits since start.", lambda: principal_cache.local.hits))
+registry.register(Gauge("principal_cache_misses", "Principal cache misses since start.", lambda: principal_cache.local.misses))
+registry.register(Gauge("catalog_cache_hits", "Catalog response cache hits since start.", lambda: catalog_cache.hits))
+registry.register(Gauge("catalog_cache_misses", "Catalog response cache misses since start.", lambda: catalog_cache.misses))
+registry.register(Gauge("catalog_cache_bytes", "Bytes held by the catalog response cache.", lambda: catalog_cache.stats()["bytes"]))
+registry.register(Gauge("password_hash_pending", "bcrypt jobs running or queued.", lambda: password_hasher._pending))
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 app.include_router(courses.router, prefix="/courses", tags=["courses"])
 app.include_router(candidates.router, prefix="/candidates", tags=["candidates"])
 app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(audit.router, prefix="/audit", tags=["audit"])
+app.include_router(profiling.router, prefix="/profiling", tags=["profiling"])
 
 # Root endpoint
 @app.get("/")
@@ -44,7 +90,7 @@ async def root():
         "timestamp": datetime.utcnow()
     }
 
-# Health check endpoint
+# Liveness: the process is up (does not touch the database; see /ready)
 @app.get("/health")
 async def health_check():
     return {
@@ -53,21 +99,40 @@ async def health_check():
         "environment": os.getenv("ENVIRONMENT", "development")
     }
 
-# Create database tables
+# Readiness: warmed up, database reachable and migrated; 503 until then
+@app.get("/ready")
+async def readiness_check():
+    ready, checks = await readiness.check()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", "checks": checks, "timestamp": datetime.utcnow().isoformat()},
+    )
+
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Schema changes are applied by `alembic upgrade head` before deploying, never by workers
 @app.on_event("startup")
 async def startup_event():
-    try:
-        # Test connection first
-        with engine.connect() as conn:
-            conn.execute("SELECT 1")
-        print("✅ Database connection successful")
-        
-        # Create tables
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created successfully")
-    except Exception as e:
-        print(f"⚠️  Database connection/table creation failed: {e}")
-        print("Server will continue - tables may already exist")
+    # Pre-warm pooled connections and compiled statements so the first requests are not cold
+    await readiness.start()
+    # Background writer for the audit trail
+    audit_log.start()
+    # Polls the shared catalog cache versions (only with RESPONSE_CACHE_URL)
+    catalog_cache.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await readiness.stop()
+    await catalog_cache.stop()
+    # Write out queued audit events before the engine goes away
+    await audit_log.stop()
+    password_hasher.shutdown()
+    await engine.dispose()
+    if REPLICA_ENABLED:
+        await read_engine.dispose()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,203 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0):
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        # Per label set: [per-bucket counts (non-cumulative, last is +Inf), sum, count]
+        self.values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labels, label_values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.callback()}"]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP responses by route and status code.", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS, ("method", "route")))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "Database queries executed per HTTP request.", QUERY_COUNT_BUCKETS, ("method", "route")))
+db_queries_total = registry.register(Counter("db_queries_total", "Database statements executed."))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "Database statement execution time.", QUERY_BUCKETS))
+db_pool_checkout_wait = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool.", QUERY_BUCKETS))
+
+# Statements run by the current request, set by MetricsMiddleware
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_queries_total.inc()
+    db_query_duration.observe(elapsed)
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+
+def instrument_engine(engine, pool_prefix: str = "db_pool"):
+    """Attach query timing hooks and pool gauges (named ``pool_prefix``_*) to an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    pool = sync_engine.pool
+    if hasattr(pool, "checkedout"):
+        registry.register(Gauge(f"{pool_prefix}_size", "Configured pool size.", pool.size))
+        registry.register(Gauge(f"{pool_prefix}_checked_out", "Connections currently in use.", pool.checkedout))
+        registry.register(Gauge(f"{pool_prefix}_overflow", "Connections open beyond pool_size.", lambda: max(pool.overflow(), 0)))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and query count per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_label(scope) -> str:
+        # Label by the matched route's template (e.g. /jobs/{job_id}), which the router stores in the scope.
+        # Raw paths never become label values, so series cardinality stays bounded by the route table
+        route = scope.get("route")
+        template = getattr(route, "path", None)
+        if template is None:
+            return "unmatched"
+        path = scope["path"]
+        regex = getattr(route, "path_regex", None)
+        if regex is None or regex.match(path):
+            return template
+        # Newer FastAPI keeps included routers nested, so the template lacks the router prefix (e.g. /jobs);
+        # the prefix is the part of the path before the segments the route itself matched. Router prefixes are
+        # literal here, so this never copies a parameter value into the label
+        for index, char in enumerate(path):
+            if char == "/" and index and regex.match(path[index:]):
+                return path[:index] + template
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_holder = [500]
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_queries.reset(token)
+            route_label = self._route_label(scope)
+            method = scope["method"]
+            http_requests_total.inc(method, route_label, str(status_holder[0]))
+            http_request_duration.observe(elapsed, method, route_label)
+            http_request_db_queries.observe(queries[0], method, route_label)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, ForeignKey, JSON
+from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -19,6 +20,10 @@ class User(Base):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # Backs keyset pagination ordered by (created_at, id)
+        Index("ix_courses_active_created_at_id", "is_active", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -27,23 +32,51 @@ class Course(Base):
     price = Column(String(50), nullable=True)
     instructor = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # lazy="raise": load explicitly (selectinload) so async code never triggers implicit IO
+    candidates = relationship("Candidate", back_populates="course", lazy="raise")
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Backs keyset pagination ordered by (created_at, id)
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        # Backs GET /courses/{id}/candidates, paginated the same way
+        Index("ix_candidates_course_created_at_id", "course_id", "created_at", "id"),
+        # Blocking keys for duplicate detection (see app/dedup.py)
+        Index("ix_candidates_name_key", "name_key"),
+        Index("ix_candidates_phone_key", "phone_key"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
     phone = Column(String(20), nullable=True)
-    course_id = Column(Integer, nullable=True)
+    course_id = Column(Integer, ForeignKey("courses.id", name="fk_candidates_course_id_courses"), nullable=True)
     status = Column(String(50), default="pending")  # pending, enrolled, completed
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Normalized name and phone, derived on write (app/dedup.py)
+    name_key = Column(String(255), nullable=True)
+    phone_key = Column(String(20), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    course = relationship("Course", back_populates="candidates", lazy="raise")
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Backs keyset pagination ordered by (created_at, id)
+        Index("ix_jobs_active_created_at_id", "is_active", "created_at", "id"),
+        # MySQL FULLTEXT index for /jobs/search; other dialects use the in-process index
+        Index("ft_jobs_search", "title", "company", "location", "requirements", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+        # /jobs location/company filters, still ordered for keyset pagination
+        Index("ix_jobs_active_location_key_created_at_id", "is_active", "location_key", "created_at", "id"),
+        Index("ix_jobs_active_company_key_created_at_id", "is_active", "company_key", "created_at", "id"),
+        # /jobs?min_salary= range filter
+        Index("ix_jobs_active_salary_max", "is_active", "salary_max"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -52,6 +85,38 @@ class Job(Base):
     description = Column(Text, nullable=True)
     requirements = Column(Text, nullable=True)
     salary_range = Column(String(100), nullable=True)
+    # Derived from company/location/salary_range by app.facets (normalized keys, yearly rupees)
+    company_key = Column(String(255), nullable=True)
+    location_key = Column(String(255), nullable=True)
+    salary_min = Column(Integer, nullable=True)
+    salary_max = Column(Integer, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Dashboard aggregates, kept current by app.stats on every candidate/job/course write
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+    
+    dimension = Column(String(50), primary_key=True)  # e.g. candidates_by_status
+    key = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+# Who changed what through the API; written in batches by app.audit
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        # Newest-first keyset paging, overall and per entity/actor
+        Index("ix_audit_events_created_at_id", "created_at", "id"),
+        Index("ix_audit_events_entity_created_at_id", "entity", "entity_id", "created_at", "id"),
+        Index("ix_audit_events_actor_created_at_id", "actor_id", "created_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    actor_id = Column(Integer, nullable=True)  # No foreign key: the trail outlives deleted users
+    actor = Column(String(100), nullable=True)
+    action = Column(String(20), nullable=False)  # create, update, delete, import
+    entity = Column(String(50), nullable=False)  # jobs, courses, candidates
+    entity_id = Column(Integer, nullable=True)
+    changes = Column(JSON, nullable=True)  # Submitted fields (create/update) or a summary (import)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # When the change was made, not flushed
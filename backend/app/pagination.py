@@ -0,0 +1,91 @@
+import base64
+import os
+from datetime import datetime
+from typing import List, MutableMapping, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Most ids one ?ids= batch lookup may ask for, and the response header listing requested ids that were not found
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(stmt, model, cursor: str, limit: int):
+    """Order ``stmt`` newest first by ``(created_at, id)`` and seek past ``cursor``.
+
+    An empty cursor starts at the first page. One extra row is fetched so the
+    caller can tell whether another page exists (see ``finish_keyset_page``).
+    """
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        # The redundant created_at bound gives planners a plain index range to seek on
+        stmt = stmt.filter(
+            model.created_at <= created_at,
+            tuple_(model.created_at, model.id) < tuple_(created_at, id),
+        )
+    return stmt.limit(limit + 1)
+
+
+def finish_keyset_page(rows, limit: int, headers: MutableMapping[str, str]):
+    """Trim the look-ahead row and expose the next cursor in a response header."""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
+
+
+def parse_ids(ids: str) -> List[int]:
+    """Parse ``?ids=3,1,2`` into distinct ids, keeping the request order."""
+    try:
+        parsed = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must list at least one id")
+    if len(parsed) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    return parsed
+
+
+def finish_id_batch(rows, ids: List[int], headers: MutableMapping[str, str]):
+    """Put batch lookup rows in request order and list the ids that were not found in a response header."""
+    by_id = {row.id: row for row in rows}
+    missing = [id for id in ids if id not in by_id]
+    if missing:
+        headers[MISSING_IDS_HEADER] = ",".join(map(str, missing))
+    return [by_id[id] for id in ids if id in by_id]
+
+
+def paginate(stmt, model, skip: int, limit: int, cursor: Optional[str], ids: Optional[List[int]] = None):
+    """Apply keyset pagination when a cursor is given (even empty), else legacy offset paging.
+
+    With ``ids`` (see ``parse_ids``) the rows are fetched by one ``id IN (...)``
+    instead; reorder them with ``finish_id_batch``.
+    """
+    if ids is not None:
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="Give either ids or cursor, not both")
+        return stmt.filter(model.id.in_(ids))
+    if cursor is not None:
+        return keyset_page(stmt, model, cursor, limit)
+    return stmt.offset(skip).limit(limit)
@@ -0,0 +1,250 @@
+"""Opt-in request profiling and a slow-query log.
+
+Profiling: an admin request carrying ``X-Profile: 1``, or a random
+PROFILE_SAMPLE_RATE fraction of all requests, runs under cProfile. Its SQL
+statements (in order, with timings and parameter shapes) are recorded as
+well. The result is kept in memory, its id is returned in ``X-Profile-Id``,
+and admins read it from ``GET /profiling/profiles/{id}``. cProfile sees the
+whole event loop, so work done concurrently for other requests shows up too;
+only one request is profiled at a time.
+
+Slow queries: every statement on an attached engine slower than
+SLOW_QUERY_MS is logged with its route, parameter shape (types only, never
+values) and duration. For SELECT/UPDATE/DELETE statements an ``EXPLAIN`` is
+captured afterwards on a separate connection, at most once per statement
+text per SLOW_QUERY_EXPLAIN_TTL seconds.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from itertools import count
+from typing import Optional
+
+from sqlalchemy import event
+
+from .auth import resolve_principal
+from .cache import TTLCache, run_soon
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "true").lower() not in ("0", "false", "no")
+# Fraction of all requests profiled without asking (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "40"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() not in ("0", "false", "no")
+SLOW_QUERY_EXPLAIN_TTL = float(os.getenv("SLOW_QUERY_EXPLAIN_TTL", "300"))
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+EXPLAINABLE = ("select", "update", "delete")
+
+# Set per request by ProfilingMiddleware: the route label and, when profiling, the statement list
+_current_route: ContextVar[Optional[str]] = ContextVar("profiling_route", default=None)
+_profile_queries: ContextVar[Optional[list]] = ContextVar("profile_queries", default=None)
+# True inside the EXPLAIN task, so explaining a slow statement cannot log (and explain) itself
+_explaining: ContextVar[bool] = ContextVar("profiling_explaining", default=False)
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Types of the bound parameters (values are never recorded)."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, size: int = SLOW_QUERY_LOG_SIZE,
+                 explain: bool = SLOW_QUERY_EXPLAIN, explain_ttl: float = SLOW_QUERY_EXPLAIN_TTL):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.entries = deque(maxlen=size)
+        self._ids = count(1)
+        # Statement text -> captured plan, so a hot slow query is explained once per TTL
+        self._plans = TTLCache(maxsize=256, ttl=explain_ttl)
+
+    def record(self, engine, statement: str, parameters, executemany: bool, duration_ms: float):
+        entry = {
+            "id": next(self._ids),
+            "route": _current_route.get(),
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+            "duration_ms": round(duration_ms, 3),
+            "explain": None,
+            "created_at": datetime.utcnow(),
+        }
+        self.entries.append(entry)
+        if not self.explain or executemany or not statement.lstrip().lower().startswith(EXPLAINABLE):
+            return
+        plan = self._plans.get(statement)
+        if plan is not None:
+            entry["explain"] = plan
+            return
+        # EXPLAIN can't share the connection mid-result, so it runs afterwards on a pooled one
+        self._plans.set(statement, {"pending": True})
+        run_soon(self._explain(engine, entry, statement, parameters))
+
+    async def _explain(self, engine, entry: dict, statement: str, parameters):
+        # Runs in a copy of the slow request's context; keep its own statements out of that request's profile
+        _explaining.set(True)
+        _profile_queries.set(None)
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(prefix + statement, parameters or ())
+                plan = [dict(row._mapping) for row in result]
+        except Exception as e:
+            plan = {"error": str(e).splitlines()[0]}
+        self._plans.set(statement, plan)
+        entry["explain"] = plan
+
+    def list(self, limit: int):
+        return list(reversed(self.entries))[:limit]
+
+    def clear(self):
+        self.entries.clear()
+        self._plans.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def attach_query_log(engine):
+    """Time every statement on ``engine`` (an AsyncEngine) for request profiles and the slow-query log."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["profiling_start"].pop()) * 1000
+        queries = _profile_queries.get()
+        if queries is not None:
+            queries.append({
+                "statement": statement,
+                "parameters": parameter_shape(parameters, executemany),
+                "duration_ms": round(duration_ms, 3),
+            })
+        if duration_ms >= slow_query_log.threshold_ms and not _explaining.get():
+            slow_query_log.record(engine, statement, parameters, executemany, duration_ms)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("profiling_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+class ProfileStore:
+    def __init__(self, size: int = PROFILE_STORE_SIZE):
+        self.profiles = deque(maxlen=size)
+        self._ids = count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: dict):
+        self.profiles.append(profile)
+
+    def get(self, profile_id: int) -> Optional[dict]:
+        return next((profile for profile in self.profiles if profile["id"] == profile_id), None)
+
+    def list(self):
+        return list(reversed(self.profiles))
+
+
+profile_store = ProfileStore()
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            value = value.decode("latin-1")
+            if value.lower().startswith("bearer "):
+                return value[7:]
+    return None
+
+
+def _format_stats(profiler: cProfile.Profile, top: int) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling admin requests that ask for it, plus a sampled share of all requests."""
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+        self._active = False
+
+    async def _wants_profile(self, scope) -> bool:
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        header = PROFILE_HEADER.lower().encode()
+        requested = any(name == header and value in (b"1", b"true") for name, value in scope.get("headers", ()))
+        if not requested:
+            return False
+        token = _bearer_token(scope)
+        principal = await resolve_principal(token) if token else None
+        return principal is not None and principal.is_admin
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route_token = _current_route.set(f"{scope['method']} {scope['path']}")
+        try:
+            # One profile at a time: a second cProfile would replace the first one's hooks
+            if self._active or not await self._wants_profile(scope):
+                return await self.app(scope, receive, send)
+            await self._profile(scope, receive, send)
+        finally:
+            _current_route.reset(route_token)
+
+    async def _profile(self, scope, receive, send):
+        self._active = True
+        profile_id = profile_store.next_id()
+        status_holder = [500]
+        queries = []
+        queries_token = _profile_queries.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER.lower().encode(), str(profile_id).encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            _profile_queries.reset(queries_token)
+            self._active = False
+            profile_store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_holder[0],
+                "duration_ms": round(duration_ms, 3),
+                "query_count": len(queries),
+                "query_ms": round(sum(query["duration_ms"] for query in queries), 3),
+                "created_at": datetime.utcnow(),
+                "queries": queries,
+                "profile": _format_stats(profiler, PROFILE_TOP_FUNCTIONS),
+            })
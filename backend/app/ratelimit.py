@@ -0,0 +1,212 @@
+import os
+import math
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import jwt
+
+from .auth import SECRET_KEY, ALGORITHM
+from .cache import TTLCache, create_shared_store
+from .metrics import Counter, registry
+
+# Rules: "METHOD PATH=LIMIT/PERIOD[:ip|user]" separated by ";" (METHOD may be *, PERIOD second|minute|hour|day)
+DEFAULT_RATE_LIMITS = (
+    "POST /auth/login=10/minute:ip;"
+    "POST /auth/register=5/minute:ip;"
+    "POST /auth/register-candidate=5/minute:ip;"
+    "GET /jobs/=300/minute:ip"
+)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMITS = os.getenv("RATE_LIMITS", DEFAULT_RATE_LIMITS)
+# Empty: counters live in this worker. memory:// (local stand-in) or redis://... share them between workers
+RATE_LIMIT_STORAGE_URL = os.getenv("RATE_LIMIT_STORAGE_URL")
+# Distinct clients tracked by the in-process backend before the least recently seen are dropped
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Only behind a proxy that sets it: otherwise clients can spoof their IP
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+rate_limited_total = registry.register(Counter(
+    "rate_limited_total", "Requests rejected with 429 by rule.", ("rule",)))
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    method: str
+    path: str
+    limit: int
+    window: float
+    key: str = "ip"  # ip or user (user falls back to ip for anonymous requests)
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.method == "*" or self.method == method) and self.path == path
+
+
+def parse_rules(spec: str) -> List[RateLimitRule]:
+    rules = []
+    for item in spec.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            route, rate = item.rsplit("=", 1)
+            method, path = route.split()
+            rate, _, key = rate.partition(":")
+            limit, period = rate.split("/")
+            rule = RateLimitRule(method.upper(), path, int(limit), PERIODS[period.strip().lower()], key.strip() or "ip")
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Invalid rate limit rule {item!r}: expected 'METHOD PATH=LIMIT/PERIOD[:ip|user]'") from e
+        if rule.key not in ("ip", "user"):
+            raise ValueError(f"Invalid rate limit key {rule.key!r} in {item!r}: expected ip or user")
+        rules.append(rule)
+    return rules
+
+
+def sliding_window(limit: int, window: float, elapsed: float, previous: int, current: int) -> Tuple[bool, float]:
+    """Sliding-window counter decision for one more request.
+
+    The rate is estimated as the current fixed window's count plus the previous
+    window's count weighted by how much of it still overlaps the sliding window.
+    ``current`` already includes this request. Returns ``(allowed, retry_after)``.
+    """
+    weight = 1 - elapsed / window
+    if previous * weight + current <= limit:
+        return True, 0.0
+    if current <= limit and previous:
+        # Still in this window: wait until enough of the previous window has slid out
+        retry_after = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        # Only once this window's accepted requests have become the weighted "previous" ones
+        accepted = current - 1
+        retry_after = (window - elapsed) + max(window * (1 - (limit - 1) / accepted), 0.0) if accepted else window - elapsed
+    return False, max(retry_after, 0.0)
+
+
+class MemoryRateLimitBackend:
+    """Per-worker counters; each client key holds [window index, previous count, current count]."""
+
+    def __init__(self, max_keys: int):
+        self._counters = TTLCache(maxsize=max_keys, ttl=float("inf"))
+
+    async def hit(self, rule: RateLimitRule, key: str, now: float) -> Tuple[bool, float]:
+        index, elapsed = divmod(now, rule.window)
+        cache_key = (rule.name, key)
+        counter = self._counters.get(cache_key)
+        if counter is None or counter[0] < index - 1:
+            counter = [index, 0, 0]
+        elif counter[0] == index - 1:
+            counter = [index, counter[2], 0]
+        counter[2] += 1
+        allowed, retry_after = sliding_window(rule.limit, rule.window, elapsed, counter[1], counter[2])
+        if not allowed:
+            counter[2] -= 1  # Rejected requests do not consume quota
+        self._counters.set(cache_key, counter)
+        return allowed, retry_after
+
+
+class StoreRateLimitBackend:
+    """Counters in a shared store (RedisStore, or MemoryStore as a local stand-in) so all workers share limits."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def hit(self, rule: RateLimitRule, key: str, now: float) -> Tuple[bool, float]:
+        index, elapsed = divmod(now, rule.window)
+        prefix = f"ratelimit:{rule.name}:{key}:"
+        # Atomic increment first so concurrent workers never both slip under the limit
+        current = await self.store.incr(f"{prefix}{int(index)}", 1, ttl=rule.window * 2)
+        previous = int(await self.store.get(f"{prefix}{int(index) - 1}") or 0)
+        allowed, retry_after = sliding_window(rule.limit, rule.window, elapsed, previous, current)
+        if not allowed:
+            await self.store.incr(f"{prefix}{int(index)}", -1, ttl=rule.window * 2)
+        return allowed, retry_after
+
+
+class RateLimiter:
+    def __init__(self, rules: List[RateLimitRule], backend):
+        self.rules = rules
+        self.backend = backend
+
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def hit(self, rule: RateLimitRule, key: str, now: Optional[float] = None) -> Tuple[bool, float]:
+        return await self.backend.hit(rule, key, time.time() if now is None else now)
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    rules = parse_rules(RATE_LIMITS) if RATE_LIMIT_ENABLED else []
+    if not rules:
+        return None
+    store = create_shared_store(RATE_LIMIT_STORAGE_URL)
+    backend = StoreRateLimitBackend(store) if store is not None else MemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS)
+    return RateLimiter(rules, backend)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def client_key(scope, rule: RateLimitRule) -> str:
+    if rule.key == "user":
+        authorization = _header(scope, b"authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            try:
+                username = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+            except jwt.PyJWTError:
+                username = None
+            if username:
+                return f"user:{username}"
+    return f"ip:{client_ip(scope)}"
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware answering 429 with Retry-After once a client exceeds a route's rule."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rule = self.limiter.match(scope["method"], scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        allowed, retry_after = await self.limiter.hit(rule, client_key(scope, rule))
+        if allowed:
+            return await self.app(scope, receive, send)
+
+        rate_limited_total.inc(rule.name)
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                (b"x-ratelimit-limit", f"{rule.limit};w={int(rule.window)}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b'{"detail":"Too many requests"}'})
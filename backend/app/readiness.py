@@ -0,0 +1,158 @@
+import os
+import asyncio
+from datetime import datetime
+from typing import Optional, Tuple
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import select, text
+from sqlalchemy.orm import configure_mappers
+
+from .database import engine, read_engine, REPLICA_ENABLED, SessionLocal, ReadSessionLocal, DB_POOL_SIZE, DB_READ_POOL_SIZE
+from .models import User, Course, Candidate, Job
+from .pagination import paginate, encode_cursor
+from .search import job_search
+from .stats import read_stats
+
+# Connections each worker opens before it reports ready (capped at the pool size)
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", str(DB_POOL_SIZE)))
+DB_READ_POOL_PREWARM = int(os.getenv("DB_READ_POOL_PREWARM", str(DB_READ_POOL_SIZE)))
+# Per-check budget for /ready; a slower database counts as not ready
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "2"))
+WARMUP_RETRY_MAX_DELAY = 30.0
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def _describe(error: Exception) -> str:
+    # Driver errors carry multi-line SQL and doc links; the first line is enough for a probe
+    return str(error).splitlines()[0] if str(error) else type(error).__name__
+
+
+def expected_schema_revision() -> Optional[str]:
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+
+
+async def prewarm_pool(engine, connections: int) -> int:
+    """Open up to ``connections`` pooled connections at once and hand them back to the pool."""
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+    if connections <= 0:
+        return 0
+    results = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    try:
+        errors = [error for error in results if isinstance(error, BaseException)]
+        if errors:
+            raise errors[0]
+        for conn in opened:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
+async def warm_statement_cache(session_factory):
+    """Run the hot read queries once so their compiled SQL is cached before real traffic arrives."""
+    cursor = encode_cursor(datetime.utcnow(), 0)
+    statements = [select(User).filter(User.username == "")]
+    for model, stmt in (
+        (Job, select(Job).filter(Job.is_active == True)),
+        (Course, select(Course).filter(Course.is_active == True)),
+        (Candidate, select(Candidate)),
+    ):
+        statements += [
+            paginate(stmt, model, 0, 100, None),
+            paginate(stmt, model, 0, 100, ""),
+            paginate(stmt, model, 0, 100, cursor),
+            select(model).filter(model.id == 0),
+        ]
+    async with session_factory() as db:
+        for stmt in statements:
+            await db.execute(stmt)
+        await read_stats(db)
+        if job_search.index is not None:
+            await job_search.ensure_loaded(db)
+
+
+class Readiness:
+    """Warms a worker up at startup and answers /ready.
+
+    A worker is ready once warm-up has succeeded and, at probe time, the
+    primary answers within READINESS_TIMEOUT with the schema at the newest
+    migration (and the replica, if configured, answers too). Failed warm-ups
+    are retried in the background with backoff instead of being swallowed.
+    """
+
+    def __init__(self):
+        self.warmed = False
+        self.last_error: Optional[str] = None
+        self.expected_revision = expected_schema_revision()
+        self._retry_task: Optional[asyncio.Task] = None
+
+    async def warm_up(self):
+        configure_mappers()
+        opened = await prewarm_pool(engine, DB_POOL_PREWARM)
+        await warm_statement_cache(SessionLocal)
+        if REPLICA_ENABLED:
+            opened += await prewarm_pool(read_engine, DB_READ_POOL_PREWARM)
+            await warm_statement_cache(ReadSessionLocal)
+        self.warmed = True
+        self.last_error = None
+        return opened
+
+    async def start(self):
+        try:
+            opened = await self.warm_up()
+            print(f"✅ Worker warmed up ({opened} pooled connections)")
+        except Exception as e:
+            self.last_error = f"warm-up failed: {_describe(e)}"
+            print(f"⚠️  Worker warm-up failed, retrying in the background: {_describe(e)}")
+            self._retry_task = asyncio.create_task(self._retry())
+
+    async def _retry(self):
+        delay = 1.0
+        while not self.warmed:
+            await asyncio.sleep(delay)
+            try:
+                opened = await self.warm_up()
+                print(f"✅ Worker warmed up ({opened} pooled connections)")
+            except Exception as e:
+                self.last_error = f"warm-up failed: {_describe(e)}"
+                delay = min(delay * 2, WARMUP_RETRY_MAX_DELAY)
+
+    async def stop(self):
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+
+    async def _check_primary(self) -> str:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            revision = result.scalar()
+        if revision != self.expected_revision:
+            raise RuntimeError(f"schema at revision {revision}, expected {self.expected_revision}; run `alembic upgrade head`")
+        return "ok"
+
+    async def _check_replica(self) -> str:
+        async with read_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return "ok"
+
+    async def check(self) -> Tuple[bool, dict]:
+        checks = {"warm_up": "ok" if self.warmed else (self.last_error or "in progress")}
+        probes = {"database": self._check_primary}
+        if REPLICA_ENABLED:
+            probes["replica"] = self._check_replica
+        for name, probe in probes.items():
+            try:
+                checks[name] = await asyncio.wait_for(probe(), READINESS_TIMEOUT)
+            except asyncio.TimeoutError:
+                checks[name] = f"no response within {READINESS_TIMEOUT}s"
+            except Exception as e:
+                checks[name] = _describe(e)
+        return all(value == "ok" for value in checks.values()), checks
+
+
+readiness = Readiness()
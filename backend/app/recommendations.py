@@ -0,0 +1,312 @@
+"""Job recommendations for a candidate's course (``GET /candidates/{id}/recommended-jobs``).
+
+Each active job's ``requirements`` skill list ("Python, SQL, Node.js") is
+kept as a row of a sparse job x skill matrix, stored as NumPy (row, column)
+arrays. A course is matched by the skill phrases its title and description
+mention. Ranking a course is one vectorised pass over the matrix: TF-IDF
+cosine similarity computed with ``np.bincount``, then a partial sort. Results
+are cached per course, since every candidate in a course gets the same list.
+
+The jobs and courses routers keep the index current as they write. The
+index is per process, so it is also rebuilt from the database every
+RECOMMEND_REFRESH_INTERVAL seconds, and course phrases are re-read then, to
+pick up other workers' job and course writes.
+"""
+import asyncio
+import contextvars
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from .cache import TTLCache
+from .models import Course, Job
+from .search import SUMMARY_FIELDS
+
+# Ranked jobs kept per course (the most a request can ask for), and how many courses are cached
+RECOMMEND_MAX_RESULTS = int(os.getenv("RECOMMEND_MAX_RESULTS", "100"))
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "1024"))
+RECOMMEND_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", "300"))
+# Seconds between rebuilds of the index from the database (0 disables)
+RECOMMEND_REFRESH_INTERVAL = float(os.getenv("RECOMMEND_REFRESH_INTERVAL", "300"))
+
+# Requirement items longer than this are prose ("3+ years of backend experience"), not skills
+MAX_SKILL_WORDS = 3
+_ITEM_SPLIT = re.compile(r"[,;|\n•]+")
+# Keeps "node.js", "asp.net", "c++" and "c#" whole; a trailing full stop is dropped
+_SKILL_TOKEN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+# Dead rows tolerated before the matrix is compacted
+_COMPACT_MIN_ROWS = 1024
+
+
+def skill_terms(requirements: Optional[str]) -> List[str]:
+    """Normalized skills of a ``requirements`` list, e.g. "Python, Node.js" -> ["python", "node.js"]."""
+    terms = set()
+    for item in _ITEM_SPLIT.split((requirements or "").casefold()):
+        tokens = _SKILL_TOKEN.findall(item)
+        if 0 < len(tokens) <= MAX_SKILL_WORDS:
+            terms.add(" ".join(tokens))
+    return sorted(terms)
+
+
+def course_terms(title: Optional[str], description: Optional[str]) -> Counter:
+    """Every phrase of up to MAX_SKILL_WORDS words in a course's text, with counts; ranking keeps the known skills."""
+    tokens = _SKILL_TOKEN.findall(f"{title or ''}\n{description or ''}".casefold())
+    return Counter(
+        " ".join(tokens[start:start + size])
+        for size in range(1, MAX_SKILL_WORDS + 1)
+        for start in range(len(tokens) - size + 1)
+    )
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SkillIndex:
+    """Sparse job x skill matrix: one row per active job, appended in place as jobs are written."""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.skills: List[str] = []
+        self.df = np.zeros(256, dtype=np.int64)  # Active jobs per skill
+        self._rows = np.zeros(4096, dtype=np.int32)
+        self._cols = np.zeros(4096, dtype=np.int32)
+        self.nnz = 0
+        self.row_jobs = np.zeros(1024, dtype=np.int64)
+        self.alive = np.zeros(1024, dtype=bool)
+        self.n_rows = 0
+        self.dead = 0
+        self.job_rows: Dict[int, int] = {}
+        self.job_cols: Dict[int, np.ndarray] = {}
+        self._norms: Optional[np.ndarray] = None
+
+    def add(self, job):
+        """Index (or re-index) a job; inactive jobs and jobs without skills are removed instead."""
+        self.remove(job.id)
+        terms = skill_terms(job.requirements)
+        if getattr(job, "is_active", True) is False or not terms:
+            return
+        cols = np.array([self._column(term) for term in terms], dtype=np.int32)
+        row = self.n_rows
+        self.n_rows += 1
+        self.row_jobs = _grow(self.row_jobs, self.n_rows)
+        self.alive = _grow(self.alive, self.n_rows)
+        self.row_jobs[row], self.alive[row] = job.id, True
+        end = self.nnz + len(cols)
+        self._rows, self._cols = _grow(self._rows, end), _grow(self._cols, end)
+        self._rows[self.nnz:end], self._cols[self.nnz:end] = row, cols
+        self.nnz = end
+        self.df[cols] += 1
+        self.job_rows[job.id], self.job_cols[job.id] = row, cols
+        self._norms = None
+
+    def _column(self, term: str) -> int:
+        col = self.vocab.get(term)
+        if col is None:
+            col = self.vocab[term] = len(self.skills)
+            self.skills.append(term)
+            self.df = _grow(self.df, len(self.skills))
+        return col
+
+    def remove(self, job_id: int):
+        row = self.job_rows.pop(job_id, None)
+        if row is None:
+            return
+        self.df[self.job_cols.pop(job_id)] -= 1
+        self.alive[row] = False
+        self.dead += 1
+        self._norms = None
+        if self.dead >= _COMPACT_MIN_ROWS and 2 * self.dead > self.n_rows:
+            self._compact()
+
+    def _compact(self):
+        # Drop the entries of removed rows and renumber the survivors
+        live = self.alive[:self.n_rows]
+        renumber = np.cumsum(live) - 1
+        keep = live[self._rows[:self.nnz]]
+        rows, cols = renumber[self._rows[:self.nnz][keep]], self._cols[:self.nnz][keep]
+        self.nnz = len(rows)
+        self._rows[:self.nnz], self._cols[:self.nnz] = rows, cols
+        jobs = self.row_jobs[:self.n_rows][live]
+        self.n_rows = len(jobs)
+        self.row_jobs[:self.n_rows] = jobs
+        self.alive[:] = False
+        self.alive[:self.n_rows] = True
+        self.job_rows = {int(job_id): row for row, job_id in enumerate(jobs)}
+        self.dead = 0
+
+    def _idf(self) -> np.ndarray:
+        live = self.n_rows - self.dead
+        df = self.df[:len(self.skills)]
+        return np.where(df > 0, np.log((1 + live) / (1 + df)) + 1, 0.0)
+
+    def _row_norms(self, idf: np.ndarray) -> np.ndarray:
+        # Every job's TF-IDF vector length, recomputed (one bincount) only after a write
+        if self._norms is None:
+            squares = np.bincount(self._rows[:self.nnz], weights=(idf ** 2)[self._cols[:self.nnz]], minlength=self.n_rows)
+            self._norms = np.sqrt(squares)
+        return self._norms
+
+    def rank(self, terms: Counter, limit: int) -> List[Tuple[int, float, List[str]]]:
+        """Best ``(job id, score, matched skills)`` for a course's phrases, by cosine similarity."""
+        query = np.zeros(len(self.skills))
+        for term, count in terms.items():
+            col = self.vocab.get(term)
+            if col is not None:
+                query[col] = 1 + math.log(count)
+        if self.n_rows == self.dead or not query.any():
+            return []
+        idf = self._idf()
+        weights = query * idf
+        # All jobs at once: each matrix entry adds its skill's query weight to its row
+        dots = np.bincount(self._rows[:self.nnz], weights=(weights * idf)[self._cols[:self.nnz]], minlength=self.n_rows)
+        norms = self._row_norms(idf) * np.linalg.norm(weights)
+        scores = np.divide(dots, norms, out=np.zeros(self.n_rows), where=norms > 0)
+        scores[~self.alive[:self.n_rows]] = 0
+        matches = np.flatnonzero(scores > 0)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(scores[matches], -limit)[-limit:]]
+        # Best score first, newest job first among ties
+        ranked = matches[np.lexsort((-self.row_jobs[matches], -scores[matches]))]
+        results = []
+        for row in ranked:
+            job_id = int(self.row_jobs[row])
+            matched = [self.skills[col] for col in self.job_cols[job_id] if query[col]]
+            results.append((job_id, round(float(scores[row]), 4), matched))
+        return results
+
+
+def build_index(rows) -> SkillIndex:
+    index = SkillIndex()
+    for row in rows:
+        index.add(row)
+    return index
+
+
+class JobRecommender:
+    """The skill index plus the per-course result cache, kept current by the jobs and courses routers."""
+
+    def __init__(self, cache_size: int = RECOMMEND_CACHE_SIZE, cache_ttl: float = RECOMMEND_CACHE_TTL,
+                 refresh_interval: float = RECOMMEND_REFRESH_INTERVAL):
+        self.index = SkillIndex()
+        self.refresh_interval = refresh_interval
+        self.loaded = False
+        self.loaded_at = 0.0
+        # Bumped by every job write; cached rankings from an older version are recomputed
+        self.version = 0
+        self._load_lock = asyncio.Lock()
+        self._pending = []
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._course_terms: Dict[int, Counter] = {}
+        self._results = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def _apply(self, op: str, arg):
+        if self.loaded:
+            getattr(self.index, op)(arg)
+            self.version += 1
+        if self._load_lock.locked():
+            # A (re)build is reading a snapshot; replay this write on top of it
+            self._pending.append((op, arg))
+
+    def index_job(self, job):
+        self._apply("add", job)
+
+    def remove_job(self, job_id: int):
+        self._apply("remove", job_id)
+
+    def index_course(self, course):
+        self._course_terms[course.id] = course_terms(course.title, course.description)
+        self._results.delete(course.id)
+
+    def remove_course(self, course_id: int):
+        self._course_terms.pop(course_id, None)
+        self._results.delete(course_id)
+
+    async def _load(self, db):
+        result = await db.execute(select(Job.id, Job.requirements).filter(Job.is_active == True))
+        rows = result.all()
+        # Parsing every requirements list is CPU work; keep the event loop serving requests meanwhile
+        index = await asyncio.to_thread(build_index, rows)
+        for op, arg in self._pending:
+            getattr(index, op)(arg)
+        self._pending.clear()
+        self.index = index
+        self.version += 1
+        # Another worker may have edited a course since its phrases were parsed; re-read them on demand
+        self._course_terms.clear()
+        self._results.clear()
+        self.loaded, self.loaded_at = True, time.monotonic()
+
+    async def _refresh(self):
+        from .database import SessionLocal
+
+        try:
+            async with self._load_lock:
+                async with SessionLocal() as db:
+                    await self._load(db)
+        except Exception as e:
+            # Keep serving the current index and retry after another interval
+            self.loaded_at = time.monotonic()
+            print(f"⚠️  Job recommendation index refresh failed: {e}")
+
+    async def ensure_loaded(self, db):
+        if self.loaded:
+            stale = self.refresh_interval and time.monotonic() - self.loaded_at > self.refresh_interval
+            if stale and not self._load_lock.locked():
+                # Rebuild in the background (fresh context: no request state) while the current index serves
+                self._refresh_task = asyncio.create_task(self._refresh(), context=contextvars.Context())
+            return
+        async with self._load_lock:
+            if not self.loaded:
+                await self._load(db)
+
+    async def _terms(self, db, course_id: int) -> Optional[Counter]:
+        terms = self._course_terms.get(course_id)
+        if terms is None:
+            result = await db.execute(select(Course.title, Course.description).filter(Course.id == course_id))
+            course = result.first()
+            if course is None:
+                return None
+            terms = self._course_terms[course_id] = course_terms(course.title, course.description)
+        return terms
+
+    async def rank_course(self, db, course_id: int) -> List[Tuple[int, float, List[str]]]:
+        """Up to RECOMMEND_MAX_RESULTS ``(job id, score, matched skills)`` for a course, cached per course."""
+        await self.ensure_loaded(db)
+        cached = self._results.get(course_id)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        terms = await self._terms(db, course_id)
+        ranked = self.index.rank(terms, RECOMMEND_MAX_RESULTS) if terms else []
+        self._results.set(course_id, (self.version, ranked))
+        return ranked
+
+
+job_recommender = JobRecommender()
+
+
+async def recommended_jobs(db, course_id: int, limit: int) -> List[dict]:
+    """Active jobs best matching a course, as job summaries with ``score`` and ``matched_skills``."""
+    ranked = await job_recommender.rank_course(db, course_id)
+    if not ranked:
+        return []
+    # The database has the final say: another worker may have closed a job this index still holds.
+    # is_active is checked here rather than in SQL, which could steer the planner off the primary key
+    columns = [getattr(Job, name) for name in SUMMARY_FIELDS]
+    result = await db.execute(select(*columns, Job.is_active).filter(Job.id.in_([job_id for job_id, _, _ in ranked])))
+    jobs = {row.id: {name: getattr(row, name) for name in SUMMARY_FIELDS} for row in result if row.is_active}
+    recommendations = [
+        dict(jobs[job_id], score=score, matched_skills=matched)
+        for job_id, score, matched in ranked if job_id in jobs
+    ]
+    return recommendations[:limit]
@@ -0,0 +1,245 @@
+import os
+import time
+import asyncio
+import hashlib
+import contextvars
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from .cache import create_shared_store, run_soon
+from .database import REPLICA_ENABLED, REPLICA_STICKINESS_SECONDS, recently_wrote
+from .serialization import dump_json
+
+# Size limits for the public catalog response cache
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Upper bound on staleness when several workers each hold their own cache
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+# Shared store (redis://...) holding each namespace's write counter, so a write through one worker
+# drops the other workers' cached pages within RESPONSE_CACHE_SYNC_INTERVAL seconds
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+RESPONSE_CACHE_SYNC_INTERVAL = float(os.getenv("RESPONSE_CACHE_SYNC_INTERVAL", "1"))
+
+# Browsers/CDNs may store the response but must revalidate it with If-None-Match
+CACHE_CONTROL = "public, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = [value.strip() for value in header.split(",")]
+    return any(value[2:] == etag if value.startswith("W/") else value == etag for value in candidates)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "headers", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, headers: Dict[str, str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Versioned, byte-bounded LRU cache of serialized public catalog responses.
+
+    Entries are keyed by namespace ("jobs", "courses"), the namespace's
+    version (list pages) or an item id (detail pages), and the request URL.
+    Writes bump the version, orphaning every cached page at once, and drop
+    only the touched item's detail entries, so unrelated detail pages stay
+    cached. ``lookup`` must be called before ``store`` for the same request.
+    For ``settle`` seconds after a write nothing is stored for the namespace,
+    since reads served by a lagging replica may not include the write yet.
+
+    The cache is per worker. With a ``shared_store``, every write also bumps the
+    namespace's counter there, and a background task polls the counters every
+    ``sync_interval`` seconds and drops this worker's entries for namespaces
+    written elsewhere. Without one, other workers serve stale pages for up to
+    ``ttl`` seconds. Either way a client that just wrote (see
+    ``database.recently_wrote``) bypasses the cache, so it reads its own writes
+    whichever worker it lands on.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, settle: float = 0.0,
+                 shared_store=None, sync_interval: float = 1.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.settle = settle
+        self.shared_store = shared_store
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bypassed = 0
+        self.remote_invalidations = 0
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._written_at: Dict[str, float] = {}
+        self._bytes = 0
+        # Last seen shared counter per namespace
+        self._shared_versions: Dict[str, int] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _shared_key(namespace: str) -> str:
+        return f"catalog_version:{namespace}"
+
+    def _key(self, request: Request, namespace: str, item_id: Optional[int]) -> tuple:
+        scope = ("item", item_id) if item_id is not None else ("list", self._versions.get(namespace, 0))
+        query = tuple(sorted(request.query_params.multi_items()))
+        return (namespace, scope, request.url.path, query)
+
+    def _evict(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def lookup(self, request: Request, namespace: str, item_id: Optional[int] = None) -> Optional[Response]:
+        """Return a 200/304 response from cache, or None if the handler must query the database."""
+        # Remember the version this request read under, so a write racing with the
+        # database query keeps its (possibly stale) result out of the cache
+        request.state.response_cache_version = self._versions.get(namespace, 0)
+        self._shared_versions.setdefault(namespace, 0)
+        if recently_wrote():
+            # This client's write may not have reached this worker's cache yet
+            self.bypassed += 1
+            return None
+        key = self._key(request, namespace, item_id)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                self._evict(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._render(request, entry)
+
+    def store(self, request: Request, namespace: str, data, response_type, item_id: Optional[int] = None,
+              headers: Optional[Dict[str, str]] = None) -> Response:
+        """Serialize ``data`` as ``response_type``, cache it and return the (possibly 304) response."""
+        body = dump_json(data, response_type)
+        entry = CachedResponse(body, make_etag(body), dict(headers or {}), time.monotonic() + self.ttl)
+        version = getattr(request.state, "response_cache_version", None)
+        settled = time.monotonic() - self._written_at.get(namespace, float("-inf")) >= self.settle
+        if version == self._versions.get(namespace, 0) and settled and len(body) <= self.max_bytes and not recently_wrote():
+            key = self._key(request, namespace, item_id)
+            self._evict(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+        return self._render(request, entry)
+
+    def _render(self, request: Request, entry: CachedResponse) -> Response:
+        headers = dict(entry.headers, ETag=entry.etag)
+        headers["Cache-Control"] = CACHE_CONTROL
+        if etag_matches(request, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, namespace: str, item_id: Optional[int] = None):
+        """Drop cached list pages for ``namespace`` and, if given, the detail entries for ``item_id``."""
+        if self.shared_store is not None:
+            run_soon(self._publish(namespace))
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+        self._written_at[namespace] = time.monotonic()
+        if item_id is not None:
+            for key in [key for key in self._entries if key[0] == namespace and key[1] == ("item", item_id)]:
+                self._evict(key)
+        # Pages from older list versions can never be hit again; reclaim their space eagerly
+        current = ("list", self._versions[namespace])
+        for key in [key for key in self._entries if key[0] == namespace and key[1][0] == "list" and key[1] != current]:
+            self._evict(key)
+
+    def invalidate_items(self, namespace: str, item_ids):
+        """``invalidate`` for many items at once (one pass over the cache instead of one per id)."""
+        self.invalidate(namespace)
+        item_ids = set(item_ids)
+        for key in [key for key in self._entries if key[0] == namespace and key[1][0] == "item" and key[1][1] in item_ids]:
+            self._evict(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _drop_namespace(self, namespace: str):
+        # Like invalidate, but for a write made elsewhere: local only, never published back
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+        self._written_at[namespace] = time.monotonic()
+        for key in [key for key in self._entries if key[0] == namespace]:
+            self._evict(key)
+
+    async def _publish(self, namespace: str):
+        try:
+            version = await self.shared_store.incr(self._shared_key(namespace))
+        except Exception as e:
+            print(f"⚠️  Catalog cache invalidation could not be shared: {e}")
+            return
+        # Our own write: nothing to drop when the sync loop sees this value
+        if version == self._shared_versions.get(namespace, 0) + 1:
+            self._shared_versions[namespace] = version
+
+    async def sync(self):
+        """Drop entries of namespaces another worker wrote to since the last call."""
+        for namespace, seen in list(self._shared_versions.items()):
+            raw = await self.shared_store.get(self._shared_key(namespace))
+            version = int(raw) if raw is not None else 0
+            if version != seen:
+                self._shared_versions[namespace] = version
+                self._drop_namespace(namespace)
+                self.remote_invalidations += 1
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                # Keep the loop alive; entries still expire after the TTL meanwhile
+                print(f"⚠️  Catalog cache sync failed: {e}")
+
+    def start(self):
+        if self.shared_store is not None and self._sync_task is None:
+            # Fresh context: the loop must not inherit the starting request's state
+            self._sync_task = asyncio.create_task(self._sync_loop(), context=contextvars.Context())
+
+    async def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "bypassed": self.bypassed,
+            "remote_invalidations": self.remote_invalidations,
+        }
+
+
+catalog_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL,
+                              REPLICA_STICKINESS_SECONDS if REPLICA_ENABLED else 0.0,
+                              create_shared_store(RESPONSE_CACHE_URL), RESPONSE_CACHE_SYNC_INTERVAL)
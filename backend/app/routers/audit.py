@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..database import get_read_db
+from ..models import AuditEvent
+from ..schemas import AuditEventResponse
+from ..pagination import keyset_page, finish_keyset_page
+from ..serialization import rows_response
+from ..auth import get_current_admin_user, Principal
+
+router = APIRouter()
+
+@router.get("/", response_model=List[AuditEventResponse])
+async def read_audit_events(cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=500),
+                            entity: Optional[str] = None, entity_id: Optional[int] = None,
+                            actor_id: Optional[int] = None, action: Optional[str] = None,
+                            db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_admin_user)):
+    # Newest first; follow X-Next-Cursor for older events (recent ones may still be queued for writing)
+    stmt = select(AuditEvent)
+    if entity is not None:
+        stmt = stmt.filter(AuditEvent.entity == entity)
+    if entity_id is not None:
+        stmt = stmt.filter(AuditEvent.entity_id == entity_id)
+    if actor_id is not None:
+        stmt = stmt.filter(AuditEvent.actor_id == actor_id)
+    if action is not None:
+        stmt = stmt.filter(AuditEvent.action == action)
+    result = await db.execute(keyset_page(stmt, AuditEvent, cursor or "", limit))
+    headers = {}
+    events = finish_keyset_page(result.scalars().all(), limit, headers)
+    return rows_response(events, AuditEventResponse, headers)
@@ -1,22 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from ..database import get_db
 from ..models import User, Course, Candidate
 from ..schemas import UserCreate, UserResponse, UserLogin, Token, CourseCreate, CourseResponse, CourseUpdate, CandidateCreate
-from ..auth import get_password_hash, verify_password, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
-from datetime import timedelta
+from ..auth import get_password_hash, verify_password, password_needs_rehash, get_default_candidate_password_hash, create_access_token, get_current_user, get_current_admin_user, principal_cache, Principal, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..response_cache import catalog_cache
+from ..dedup import possible_duplicates
+from ..audit import audit_log
+from ..serialization import rows_response
+from ..streaming import parse_fields, export_response
+from datetime import datetime, timedelta
 
 router = APIRouter()
 
 # Authentication routes
 @router.post("/register", response_model=UserResponse)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    db_user = db.query(User).filter(
+    result = await db.execute(select(User).filter(
         (User.email == user.email) | (User.username == user.username)
-    ).first()
+    ))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(
             status_code=400,
@@ -24,7 +31,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -32,14 +39,15 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         full_name=user.full_name
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login", response_model=Token)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == user_credentials.username).first()
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+async def login_user(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(User).filter(User.username == user_credentials.username))
+    user = result.scalars().first()
+    if not user or not await verify_password(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -54,6 +62,11 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade the stored hash when the configured bcrypt cost has changed
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash(user_credentials.password)
+        await db.commit()
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
@@ -66,14 +79,15 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
     }
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 # Candidate registration (creates a user account for candidates)
 @router.post("/register-candidate", response_model=UserResponse)
-async def register_candidate(candidate: CandidateCreate, db: Session = Depends(get_db)):
+async def register_candidate(candidate: CandidateCreate, db: AsyncSession = Depends(get_db)):
     # Check if candidate already exists
-    existing_candidate = db.query(Candidate).filter(Candidate.email == candidate.email).first()
+    result = await db.execute(select(Candidate).filter(Candidate.email == candidate.email))
+    existing_candidate = result.scalars().first()
     if existing_candidate:
         raise HTTPException(
             status_code=400,
@@ -81,25 +95,32 @@ async def register_candidate(candidate: CandidateCreate, db: Session = Depends(g
         )
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == candidate.email).first()
+    result = await db.execute(select(User).filter(User.email == candidate.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=400,
             detail="User with this email already exists"
         )
     
+    if candidate.course_id is not None:
+        result = await db.execute(select(Course.id).filter(Course.id == candidate.course_id))
+        if result.scalar() is None:
+            raise HTTPException(status_code=400, detail="Course not found")
+    duplicate_ids = await possible_duplicates(db, candidate.name, candidate.email, candidate.phone)
+    
     # Create username from email (before @ symbol)
     username = candidate.email.split('@')[0]
     
     # Ensure username is unique
     counter = 1
     original_username = username
-    while db.query(User).filter(User.username == username).first():
+    while (await db.execute(select(User.id).filter(User.username == username))).first():
         username = f"{original_username}{counter}"
         counter += 1
     
     # Create user account for candidate
-    hashed_password = get_password_hash("candidate123")  # Default password
+    hashed_password = await get_default_candidate_password_hash()  # Default password
     db_user = User(
         email=candidate.email,
         username=username,
@@ -109,7 +130,7 @@ async def register_candidate(candidate: CandidateCreate, db: Session = Depends(g
         is_admin=False
     )
     db.add(db_user)
-    db.flush()  # Get the user ID
+    await db.flush()  # Get the user ID
     
     # Create candidate record
     db_candidate = Candidate(
@@ -120,18 +141,40 @@ async def register_candidate(candidate: CandidateCreate, db: Session = Depends(g
         status="pending"
     )
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    # Self-registration is public, so a likely duplicate is never returned; it goes to the audit trail for admins
+    changes = candidate.dict()
+    if duplicate_ids:
+        changes["possible_duplicates"] = duplicate_ids
+    await audit_log.record(Principal.from_user(db_user), "register", "candidates", db_candidate.id, changes)
     
     return db_user
 
 # Get all users (admin only)
 @router.get("/users", response_model=List[UserResponse])
-async def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_all_users(db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    users = db.query(User).all()
-    return users
+    result = await db.execute(select(User))
+    users = result.scalars().all()
+    return rows_response(users, UserResponse)
+
+USER_EXPORT_FIELDS = ("id", "email", "username", "full_name", "is_active", "is_admin", "created_at", "updated_at")
+
+# Export users as CSV/NDJSON (admin only)
+@router.get("/users/export")
+async def export_users(format: str = Query("csv", pattern="^(csv|ndjson)$"), fields: Optional[str] = None, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None, current_user: Principal = Depends(get_current_admin_user)):
+    selected = parse_fields(fields, USER_EXPORT_FIELDS)
+    return export_response(User, selected, format, "users", created_from, created_to)
+
+# Cache statistics (admin only)
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: Principal = Depends(get_current_admin_user)):
+    return {
+        "principals": principal_cache.stats(),
+        "catalog_responses": catalog_cache.stats(),
+    }
@@ -1,62 +1,262 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
 
-from ..database import get_db
-from ..models import Candidate, User
-from ..schemas import CandidateCreate, CandidateResponse, CandidateUpdate
-from ..auth import get_current_user
+from ..database import get_db, get_read_db
+from ..models import Candidate, Course
+from ..schemas import CandidateCreate, CandidateResponse, CandidateUpdate, CandidateWithCourseResponse, BulkImportReport, CandidateBulkStatusUpdate, BulkUpdateReport, DuplicateReport, JobRecommendation
+from ..streaming import detect_format, iter_records, parse_fields, export_response
+from ..pagination import paginate, parse_ids, finish_id_batch, finish_keyset_page
+from ..stats import record_inserts
+from ..audit import audit_log
+from ..bulk import bulk_update, check_targets
+from ..dedup import DEDUP_MIN_SCORE, POSSIBLE_DUPLICATES_HEADER, derived_candidate_values, find_duplicates, possible_duplicates
+from ..recommendations import RECOMMEND_MAX_RESULTS, recommended_jobs
+from ..serialization import FastJSONResponse, rows_response, select_fields, partial_schema, load_fields
+from ..auth import get_current_user, get_current_admin_user, Principal
 
 router = APIRouter()
 
+# Related objects that GET /candidates/?include= can embed
+CANDIDATE_INCLUDES = ("course",)
+
+async def _ensure_course_exists(db: AsyncSession, course_id: Optional[int]):
+    if course_id is None:
+        return
+    result = await db.execute(select(Course.id).filter(Course.id == course_id))
+    if result.scalar() is None:
+        raise HTTPException(status_code=400, detail="Course not found")
+
 @router.post("/", response_model=CandidateResponse)
-async def create_candidate(candidate: CandidateCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_candidate(candidate: CandidateCreate, response: Response, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     # Check if candidate with email already exists
-    existing_candidate = db.query(Candidate).filter(Candidate.email == candidate.email).first()
+    result = await db.execute(select(Candidate).filter(Candidate.email == candidate.email))
+    existing_candidate = result.scalars().first()
     if existing_candidate:
         raise HTTPException(
             status_code=400,
             detail="Candidate with this email already exists"
         )
+    await _ensure_course_exists(db, candidate.course_id)
+    # Same person under another email or phone format: still created, but flagged for review
+    duplicate_ids = await possible_duplicates(db, candidate.name, candidate.email, candidate.phone)
     
-    db_candidate = Candidate(**candidate.dict())
+    candidate_data = candidate.dict()
+    db_candidate = Candidate(**candidate_data)
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
+    changes = candidate_data
+    if duplicate_ids:
+        response.headers[POSSIBLE_DUPLICATES_HEADER] = ",".join(map(str, duplicate_ids))
+        changes = {**candidate_data, "possible_duplicates": duplicate_ids}
+    await audit_log.record(current_user, "create", "candidates", db_candidate.id, changes)
     return db_candidate
 
+# Bulk import tuning
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "10000"))
+
+async def _insert_candidate_chunk(db: AsyncSession, chunk: list, report: dict):
+    """Drop rows whose email already exists or whose course is unknown (one set-wise SELECT each), then insert the rest in one executemany."""
+    emails = [candidate.email for _, candidate in chunk]
+    result = await db.execute(select(Candidate.email).filter(Candidate.email.in_(emails)))
+    existing = {email.lower() for email in result.scalars()}
+    course_ids = {candidate.course_id for _, candidate in chunk if candidate.course_id is not None}
+    known_courses = set()
+    if course_ids:
+        result = await db.execute(select(Course.id).filter(Course.id.in_(course_ids)))
+        known_courses = set(result.scalars())
+    accepted = []
+    for row_number, candidate in chunk:
+        if candidate.email.lower() in existing:
+            _record_import_error(report, row_number, candidate.email, ["Candidate with this email already exists"])
+        elif candidate.course_id is not None and candidate.course_id not in known_courses:
+            _record_import_error(report, row_number, candidate.email, ["course_id: Course not found"])
+        else:
+            accepted.append((row_number, candidate))
+    if not accepted:
+        return
+    try:
+        # Core inserts skip the mapper event that fills the blocking keys
+        rows = [_candidate_row(candidate) for _, candidate in accepted]
+        await db.execute(insert(Candidate), rows)
+        await record_inserts(db, Candidate, rows)
+        await db.commit()
+        report["inserted"] += len(accepted)
+    except IntegrityError:
+        # A concurrent writer claimed one of the emails; retry this chunk row by row
+        await db.rollback()
+        for row_number, candidate in accepted:
+            try:
+                await db.execute(insert(Candidate), [_candidate_row(candidate)])
+                await record_inserts(db, Candidate, [candidate.dict()])
+                await db.commit()
+                report["inserted"] += 1
+            except IntegrityError:
+                await db.rollback()
+                _record_import_error(report, row_number, candidate.email, ["Candidate with this email already exists"])
+
+def _candidate_row(candidate: CandidateCreate) -> dict:
+    return {**candidate.dict(), **derived_candidate_values(candidate.name, candidate.phone)}
+
+def _record_import_error(report: dict, row_number: int, email: Optional[str], errors: List[str]):
+    report["failed"] += 1
+    if len(report["errors"]) < BULK_IMPORT_MAX_ERRORS:
+        report["errors"].append({"row": row_number, "email": email, "errors": errors})
+    else:
+        report["errors_truncated"] = True
+
+@router.post("/import", response_model=BulkImportReport)
+async def import_candidates(request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"), db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_admin_user)):
+    # The request body (CSV with a header row, or NDJSON) is streamed and processed chunk by chunk
+    fmt = detect_format(request.headers.get("content-type"), format)
+    report = {"total_rows": 0, "inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    seen_emails = set()
+    chunk = []
+    async for row_number, record in iter_records(request.stream(), fmt):
+        report["total_rows"] += 1
+        if isinstance(record, Exception):
+            _record_import_error(report, row_number, None, [str(record)])
+            continue
+        try:
+            candidate = CandidateCreate(**record)
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            _record_import_error(report, row_number, record.get("email"), errors)
+            continue
+        email_key = candidate.email.lower()
+        if email_key in seen_emails:
+            _record_import_error(report, row_number, candidate.email, ["Duplicate email earlier in this upload"])
+            continue
+        seen_emails.add(email_key)
+        chunk.append((row_number, candidate))
+        if len(chunk) >= BULK_IMPORT_CHUNK_SIZE:
+            await _insert_candidate_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        await _insert_candidate_chunk(db, chunk, report)
+    report["errors"].sort(key=lambda error: error["row"])
+    await audit_log.record(current_user, "import", "candidates", changes={
+        key: report[key] for key in ("total_rows", "inserted", "failed")
+    })
+    return report
+
 @router.get("/", response_model=List[CandidateResponse])
-async def read_candidates(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    candidates = db.query(Candidate).offset(skip).limit(limit).all()
-    return candidates
+async def read_candidates(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, ids: Optional[str] = None, include: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user)):
+    # Pass ?cursor= (empty for the first page) for keyset pagination; skip/limit is kept for compatibility
+    includes = parse_fields(include, CANDIDATE_INCLUDES, "include") if include else []
+    # ?fields=id,name,... loads and returns only those columns; included relations are added on top
+    selected = select_fields(CandidateResponse, fields)
+    # ?ids=3,1,2 returns those candidates in that order; unknown ids go in X-Missing-Ids
+    id_list = parse_ids(ids) if ids is not None else None
+    stmt = select(Candidate)
+    if selected:
+        # course_id is what the course relation is loaded through
+        stmt = stmt.options(load_fields(Candidate, selected + (("course_id",) if includes else ())))
+    if "course" in includes:
+        # One extra IN query for every course on the page, however many rows it has
+        stmt = stmt.options(selectinload(Candidate.course))
+    stmt = paginate(stmt, Candidate, skip, limit, cursor, id_list)
+    result = await db.execute(stmt)
+    candidates = result.scalars().all()
+    headers = {}
+    if id_list is not None:
+        candidates = finish_id_batch(candidates, id_list, headers)
+    elif cursor is not None:
+        candidates = finish_keyset_page(candidates, limit, headers)
+    schema = CandidateWithCourseResponse if includes else CandidateResponse
+    if selected:
+        schema = partial_schema(schema, selected + tuple(includes))
+    return rows_response(candidates, schema, headers)
+
+CANDIDATE_EXPORT_FIELDS = ("id", "name", "email", "phone", "course_id", "status", "created_at", "updated_at")
+
+@router.get("/export")
+async def export_candidates(format: str = Query("csv", pattern="^(csv|ndjson)$"), fields: Optional[str] = None, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None, current_user: Principal = Depends(get_current_admin_user)):
+    # Streams every matching candidate; created_from is inclusive, created_to exclusive
+    selected = parse_fields(fields, CANDIDATE_EXPORT_FIELDS)
+    return export_response(Candidate, selected, format, "candidates", created_from, created_to)
+
+@router.post("/bulk/status", response_model=BulkUpdateReport)
+async def bulk_update_status(body: CandidateBulkStatusUpdate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_admin_user)):
+    # e.g. {"current_status": "pending", "course_id": 3, "status": "enrolled"} moves a whole cohort at once
+    criteria = []
+    if body.current_status is not None:
+        criteria.append(Candidate.status == body.current_status)
+    if body.course_id is not None:
+        criteria.append(Candidate.course_id == body.course_id)
+    check_targets(body.ids, criteria)
+    report, updated_ids = await bulk_update(db, Candidate, {"status": body.status}, body.ids, criteria)
+    await audit_log.record(current_user, "bulk_update", "candidates", changes={**body.dict(exclude_unset=True), "updated": report["updated"]})
+    return report
+
+@router.get("/duplicates", response_model=DuplicateReport)
+async def read_duplicates(min_score: float = Query(DEDUP_MIN_SCORE, ge=0, le=1), limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_admin_user)):
+    # Only candidates sharing a normalized name or phone are compared, so the cost follows the duplicates, not the table size
+    groups, skipped_blocks = await find_duplicates(db, min_score)
+    return {"groups": groups[:limit], "total_groups": len(groups), "skipped_blocks": skipped_blocks}
 
 @router.get("/{candidate_id}", response_model=CandidateResponse)
-async def read_candidate(candidate_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+async def read_candidate(candidate_id: int, db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Candidate).filter(Candidate.id == candidate_id))
+    candidate = result.scalars().first()
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
     return candidate
 
+@router.get("/{candidate_id}/recommended-jobs", response_model=List[JobRecommendation])
+async def read_recommended_jobs(candidate_id: int, limit: int = Query(20, ge=1, le=RECOMMEND_MAX_RESULTS), db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user)):
+    # Active jobs whose requirements best match the candidate's course; rankings are cached per course
+    result = await db.execute(select(Candidate.course_id).filter(Candidate.id == candidate_id))
+    candidate = result.first()
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    if candidate.course_id is None:
+        return FastJSONResponse([])
+    return FastJSONResponse(await recommended_jobs(db, candidate.course_id, limit))
+
 @router.put("/{candidate_id}", response_model=CandidateResponse)
-async def update_candidate(candidate_id: int, candidate: CandidateUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+async def update_candidate(candidate_id: int, candidate: CandidateUpdate, response: Response, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Candidate).filter(Candidate.id == candidate_id))
+    db_candidate = result.scalars().first()
     if db_candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     candidate_data = candidate.dict(exclude_unset=True)
+    if "course_id" in candidate_data:
+        await _ensure_course_exists(db, candidate_data["course_id"])
     for key, value in candidate_data.items():
         setattr(db_candidate, key, value)
+    # A changed name, email or phone can make this candidate match someone else; flag it as on create
+    duplicate_ids = []
+    if candidate_data.keys() & {"name", "email", "phone"}:
+        duplicate_ids = await possible_duplicates(db, db_candidate.name, db_candidate.email, db_candidate.phone,
+                                                  exclude_id=candidate_id)
     
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
+    changes = candidate_data
+    if duplicate_ids:
+        response.headers[POSSIBLE_DUPLICATES_HEADER] = ",".join(map(str, duplicate_ids))
+        changes = {**candidate_data, "possible_duplicates": duplicate_ids}
+    await audit_log.record(current_user, "update", "candidates", candidate_id, changes)
     return db_candidate
 
 @router.delete("/{candidate_id}")
-async def delete_candidate(candidate_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+async def delete_candidate(candidate_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Candidate).filter(Candidate.id == candidate_id))
+    candidate = result.scalars().first()
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    db.delete(candidate)
-    db.commit()
+    await db.delete(candidate)
+    await db.commit()
+    await audit_log.record(current_user, "delete", "candidates", candidate_id)
     return {"message": "Candidate deleted successfully"}
@@ -1,37 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from ..database import get_db
-from ..models import Course, User
-from ..schemas import CourseCreate, CourseResponse, CourseUpdate
-from ..auth import get_current_user
+from ..database import get_db, get_read_db
+from ..models import Course, Candidate
+from ..schemas import CourseCreate, CourseResponse, CourseUpdate, CandidateResponse, CourseBulkDeactivate, BulkUpdateReport
+from ..pagination import paginate, parse_ids, finish_id_batch, finish_keyset_page
+from ..response_cache import catalog_cache
+from ..serialization import rows_response, select_fields, partial_schema, load_fields
+from ..auth import get_current_user, get_current_admin_user, Principal
+from ..audit import audit_log
+from ..bulk import bulk_update, check_targets
+from ..recommendations import job_recommender
 
 router = APIRouter()
 
 @router.post("/", response_model=CourseResponse)
-async def create_course(course: CourseCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_course = Course(**course.dict())
+async def create_course(course: CourseCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    course_data = course.dict()
+    db_course = Course(**course_data)
     db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    await db.refresh(db_course)
+    catalog_cache.invalidate("courses", db_course.id)
+    job_recommender.index_course(db_course)
+    await audit_log.record(current_user, "create", "courses", db_course.id, course_data)
     return db_course
 
 @router.get("/", response_model=List[CourseResponse])
-async def read_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    courses = db.query(Course).filter(Course.is_active == True).offset(skip).limit(limit).all()
-    return courses
+async def read_courses(request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, ids: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    cached = catalog_cache.lookup(request, "courses")
+    if cached is not None:
+        return cached
+    
+    # ?fields=id,title,... loads and returns only those columns
+    selected = select_fields(CourseResponse, fields)
+    # ?ids=3,1,2 returns those courses in that order (inactive ones included, as on GET /courses/{id})
+    id_list = parse_ids(ids) if ids is not None else None
+    stmt = select(Course)
+    if id_list is None:
+        stmt = stmt.filter(Course.is_active == True)
+    if selected:
+        stmt = stmt.options(load_fields(Course, selected))
+    # Pass ?cursor= (empty for the first page) for keyset pagination; skip/limit is kept for compatibility
+    stmt = paginate(stmt, Course, skip, limit, cursor, id_list)
+    result = await db.execute(stmt)
+    courses = result.scalars().all()
+    headers = {}
+    if id_list is not None:
+        courses = finish_id_batch(courses, id_list, headers)
+    elif cursor is not None:
+        courses = finish_keyset_page(courses, limit, headers)
+    schema = partial_schema(CourseResponse, selected) if selected else CourseResponse
+    return catalog_cache.store(request, "courses", courses, List[schema], headers=headers)
+
+@router.post("/bulk/deactivate", response_model=BulkUpdateReport)
+async def bulk_deactivate_courses(body: CourseBulkDeactivate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_admin_user)):
+    criteria = [Course.instructor == body.instructor] if body.instructor is not None else []
+    check_targets(body.ids, criteria)
+    report, updated_ids = await bulk_update(db, Course, {"is_active": False}, body.ids, criteria)
+    catalog_cache.invalidate_items("courses", updated_ids)
+    for course_id in updated_ids:
+        job_recommender.remove_course(course_id)
+    await audit_log.record(current_user, "bulk_deactivate", "courses", changes={**body.dict(exclude_unset=True), "updated": report["updated"]})
+    return report
 
 @router.get("/{course_id}", response_model=CourseResponse)
-async def read_course(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+async def read_course(course_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    cached = catalog_cache.lookup(request, "courses", course_id)
+    if cached is not None:
+        return cached
+    
+    result = await db.execute(select(Course).filter(Course.id == course_id))
+    course = result.scalars().first()
     if course is None:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    return catalog_cache.store(request, "courses", course, CourseResponse, course_id)
+
+@router.get("/{course_id}/candidates", response_model=List[CandidateResponse])
+async def read_course_candidates(course_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user)):
+    # Served by ix_candidates_course_created_at_id; same skip/limit and ?cursor= pagination as /candidates/
+    result = await db.execute(select(Course.id).filter(Course.id == course_id))
+    if result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    stmt = paginate(select(Candidate).filter(Candidate.course_id == course_id), Candidate, skip, limit, cursor)
+    result = await db.execute(stmt)
+    candidates = result.scalars().all()
+    headers = {}
+    if cursor is not None:
+        candidates = finish_keyset_page(candidates, limit, headers)
+    return rows_response(candidates, CandidateResponse, headers)
 
 @router.put("/{course_id}", response_model=CourseResponse)
-async def update_course(course_id: int, course: CourseUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_course = db.query(Course).filter(Course.id == course_id).first()
+async def update_course(course_id: int, course: CourseUpdate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Course).filter(Course.id == course_id))
+    db_course = result.scalars().first()
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
@@ -39,16 +104,23 @@ async def update_course(course_id: int, course: CourseUpdate, db: Session = Depe
     for key, value in course_data.items():
         setattr(db_course, key, value)
     
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    await db.refresh(db_course)
+    catalog_cache.invalidate("courses", db_course.id)
+    job_recommender.index_course(db_course)
+    await audit_log.record(current_user, "update", "courses", course_id, course_data)
     return db_course
 
 @router.delete("/{course_id}")
-async def delete_course(course_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+async def delete_course(course_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Course).filter(Course.id == course_id))
+    course = result.scalars().first()
     if course is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
     course.is_active = False
-    db.commit()
+    await db.commit()
+    catalog_cache.invalidate("courses", course.id)
+    job_recommender.remove_course(course.id)
+    await audit_log.record(current_user, "delete", "courses", course_id)
     return {"message": "Course deactivated successfully"}
@@ -1,37 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from ..database import get_db
-from ..models import Job, User
-from ..schemas import JobCreate, JobResponse, JobUpdate
-from ..auth import get_current_user
+from ..database import get_db, get_read_db
+from ..models import Job
+from ..schemas import JobCreate, JobFacetsResponse, JobResponse, JobUpdate, JobSearchResult, JobBulkDeactivate, BulkUpdateReport
+from ..search import job_search
+from ..recommendations import job_recommender
+from ..facets import filter_jobs, job_criteria, job_facets
+from ..bulk import bulk_update, check_targets
+from ..job_feed import job_feed, publish_job
+from ..pagination import paginate, parse_ids, finish_id_batch, finish_keyset_page
+from ..response_cache import catalog_cache
+from ..serialization import FastJSONResponse, select_fields, partial_schema, load_fields
+from ..auth import get_current_user, get_current_admin_user, Principal
+from ..audit import audit_log
 
 router = APIRouter()
 
 @router.post("/", response_model=JobResponse)
-async def create_job(job: JobCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_job = Job(**job.dict())
+async def create_job(job: JobCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    job_data = job.dict()
+    db_job = Job(**job_data)
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    catalog_cache.invalidate("jobs", db_job.id)
+    job_search.index_job(db_job)
+    job_recommender.index_job(db_job)
+    publish_job("created", db_job)
+    await audit_log.record(current_user, "create", "jobs", db_job.id, job_data)
     return db_job
 
 @router.get("/", response_model=List[JobResponse])
-async def read_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    jobs = db.query(Job).filter(Job.is_active == True).offset(skip).limit(limit).all()
-    return jobs
+async def read_jobs(request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, ids: Optional[str] = None, fields: Optional[str] = None,
+                    location: Optional[str] = None, company: Optional[str] = None,
+                    min_salary: Optional[int] = Query(None, ge=0), max_salary: Optional[int] = Query(None, ge=0),
+                    db: AsyncSession = Depends(get_read_db)):
+    cached = catalog_cache.lookup(request, "jobs")
+    if cached is not None:
+        return cached
+    
+    # ?fields=id,title,company,... loads and returns only those columns (e.g. job cards skip description/requirements)
+    selected = select_fields(JobResponse, fields)
+    # ?ids=3,1,2 returns those jobs in that order (like GET /jobs/{id}, closed ones included); unknown ids go in X-Missing-Ids
+    id_list = parse_ids(ids) if ids is not None else None
+    stmt = select(Job)
+    if id_list is None:
+        stmt = stmt.filter(Job.is_active == True)
+    # location/company match case-insensitively; min_salary/max_salary are yearly rupees (8 LPA = 800000)
+    stmt = filter_jobs(stmt, location, company, min_salary, max_salary)
+    if selected:
+        stmt = stmt.options(load_fields(Job, selected))
+    # Pass ?cursor= (empty for the first page) for keyset pagination; skip/limit is kept for compatibility
+    stmt = paginate(stmt, Job, skip, limit, cursor, id_list)
+    result = await db.execute(stmt)
+    jobs = result.scalars().all()
+    headers = {}
+    if id_list is not None:
+        jobs = finish_id_batch(jobs, id_list, headers)
+    elif cursor is not None:
+        jobs = finish_keyset_page(jobs, limit, headers)
+    schema = partial_schema(JobResponse, selected) if selected else JobResponse
+    return catalog_cache.store(request, "jobs", jobs, List[schema], headers=headers)
+
+@router.get("/facets", response_model=JobFacetsResponse)
+async def read_job_facets(request: Request, location: Optional[str] = None, company: Optional[str] = None,
+                          min_salary: Optional[int] = Query(None, ge=0), max_salary: Optional[int] = Query(None, ge=0),
+                          db: AsyncSession = Depends(get_read_db)):
+    cached = catalog_cache.lookup(request, "jobs")
+    if cached is not None:
+        return cached
+    
+    # Counts per location, company and salary band for the same filters as GET /jobs/, in one query
+    facets = await job_facets(db, location, company, min_salary, max_salary)
+    return catalog_cache.store(request, "jobs", JobFacetsResponse(**facets), JobFacetsResponse)
+
+@router.get("/stream")
+async def stream_jobs(request: Request, company: Optional[str] = None, location: Optional[str] = None,
+                      last_event_id: Optional[str] = Header(None)):
+    # Server-Sent Events: created/updated/deleted job events, optionally only for one company/location.
+    # EventSource resends Last-Event-ID on reconnect; ?last_event_id= is accepted for clients that cannot set it
+    subscriber = job_feed.subscribe(company, location, last_event_id or request.query_params.get("last_event_id"))
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many open job streams", headers={"Retry-After": "30"})
+    return StreamingResponse(
+        job_feed.stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/search", response_model=List[JobSearchResult])
+async def search_jobs(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_read_db)):
+    # Ranked matches across title, company, location and requirements (descriptions are not shipped)
+    return FastJSONResponse(await job_search.search(db, q, limit))
+
+@router.post("/bulk/deactivate", response_model=BulkUpdateReport)
+async def bulk_deactivate_jobs(body: JobBulkDeactivate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_admin_user)):
+    # e.g. {"company": "Acme"} closes all of a company's jobs; company/location match like the /jobs/ filters
+    criteria = job_criteria(body.location, body.company)
+    check_targets(body.ids, criteria)
+    report, updated_ids = await bulk_update(db, Job, {"is_active": False}, body.ids, criteria)
+    catalog_cache.invalidate_items("jobs", updated_ids)
+    for job_id in updated_ids:
+        job_search.remove_job(job_id)
+        job_recommender.remove_job(job_id)
+        job_feed.publish("deleted", {"id": job_id})
+    await audit_log.record(current_user, "bulk_deactivate", "jobs", changes={**body.dict(exclude_unset=True), "updated": report["updated"]})
+    return report
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def read_job(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(Job).filter(Job.id == job_id).first()
+async def read_job(job_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    cached = catalog_cache.lookup(request, "jobs", job_id)
+    if cached is not None:
+        return cached
+    
+    result = await db.execute(select(Job).filter(Job.id == job_id))
+    job = result.scalars().first()
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    return catalog_cache.store(request, "jobs", job, JobResponse, job_id)
 
 @router.put("/{job_id}", response_model=JobResponse)
-async def update_job(job_id: int, job: JobUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_job = db.query(Job).filter(Job.id == job_id).first()
+async def update_job(job_id: int, job: JobUpdate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Job).filter(Job.id == job_id))
+    db_job = result.scalars().first()
     if db_job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -39,16 +134,27 @@ async def update_job(job_id: int, job: JobUpdate, db: Session = Depends(get_db),
     for key, value in job_data.items():
         setattr(db_job, key, value)
     
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    catalog_cache.invalidate("jobs", db_job.id)
+    job_search.index_job(db_job)
+    job_recommender.index_job(db_job)
+    publish_job("updated", db_job)
+    await audit_log.record(current_user, "update", "jobs", job_id, job_data)
     return db_job
 
 @router.delete("/{job_id}")
-async def delete_job(job_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    job = db.query(Job).filter(Job.id == job_id).first()
+async def delete_job(job_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Job).filter(Job.id == job_id))
+    job = result.scalars().first()
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
     job.is_active = False
-    db.commit()
+    await db.commit()
+    catalog_cache.invalidate("jobs", job.id)
+    job_search.remove_job(job.id)
+    job_recommender.remove_job(job.id)
+    publish_job("deleted", job)
+    await audit_log.record(current_user, "delete", "jobs", job_id)
     return {"message": "Job deactivated successfully"}
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+
+from ..schemas import ProfileResponse, ProfileSummary, SlowQueryResponse
+from ..profiling import profile_store, slow_query_log
+from ..auth import get_current_admin_user, Principal
+
+router = APIRouter()
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_profiles(current_user: Principal = Depends(get_current_admin_user)):
+    # Newest first; send a request with "X-Profile: 1" (as an admin) to add one
+    return profile_store.list()
+
+@router.get("/profiles/{profile_id}", response_model=ProfileResponse)
+async def read_profile(profile_id: int, current_user: Principal = Depends(get_current_admin_user)):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/slow-queries", response_model=List[SlowQueryResponse])
+async def list_slow_queries(limit: int = Query(50, ge=1, le=1000), current_user: Principal = Depends(get_current_admin_user)):
+    # Newest first; explain is null until the background EXPLAIN has run
+    return slow_query_log.list(limit)
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(current_user: Principal = Depends(get_current_admin_user)):
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
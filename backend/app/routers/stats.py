@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db, get_read_db
+from ..schemas import StatsResponse
+from ..stats import read_stats, rebuild_stats
+from ..auth import get_current_admin_user, Principal
+
+router = APIRouter()
+
+@router.get("/", response_model=StatsResponse)
+async def get_stats(db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_admin_user)):
+    # One SELECT over the pre-aggregated counters, independent of table sizes
+    return await read_stats(db)
+
+@router.post("/rebuild", response_model=StatsResponse)
+async def rebuild(db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_admin_user)):
+    # Repair: recompute every counter from the source tables
+    return await rebuild_stats(db)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 # User schemas
 class UserCreate(BaseModel):
@@ -77,6 +77,19 @@ class CandidateResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CourseSummary(BaseModel):
+    id: int
+    title: str
+    duration: Optional[str]
+    instructor: Optional[str]
+    is_active: bool
+    
+    class Config:
+        from_attributes = True
+
+class CandidateWithCourseResponse(CandidateResponse):
+    course: Optional[CourseSummary] = None
+
 class CandidateUpdate(BaseModel):
     name: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -84,6 +97,18 @@ class CandidateUpdate(BaseModel):
     course_id: Optional[int] = None
     status: Optional[str] = None
 
+class BulkImportError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    errors: List[str]
+
+class BulkImportReport(BaseModel):
+    total_rows: int
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+    errors_truncated: bool = False
+
 # Job schemas
 class JobCreate(BaseModel):
     title: str
@@ -101,12 +126,37 @@ class JobResponse(BaseModel):
     description: Optional[str]
     requirements: Optional[str]
     salary_range: Optional[str]
+    # Yearly rupees parsed from salary_range (None when it has no amount)
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
     is_active: bool
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+# One facet value: normalized key, display label and number of matching active jobs
+class FacetValue(BaseModel):
+    key: str
+    label: str
+    count: int
+
+class JobFacetsResponse(BaseModel):
+    location: List[FacetValue]
+    company: List[FacetValue]
+    salary: List[FacetValue]
+
+class JobSearchResult(BaseModel):
+    id: int
+    title: str
+    company: str
+    location: Optional[str]
+    salary_range: Optional[str]
+    score: float
+
+class JobRecommendation(JobSearchResult):
+    matched_skills: List[str]
+
 class JobUpdate(BaseModel):
     title: Optional[str] = None
     company: Optional[str] = None
@@ -114,3 +164,85 @@ class JobUpdate(BaseModel):
     description: Optional[str] = None
     requirements: Optional[str] = None
     salary_range: Optional[str] = None
+
+# Dashboard statistics (keys are statuses, course ids, companies or locations)
+class StatsResponse(BaseModel):
+    totals: Dict[str, int]
+    candidates_by_status: Dict[str, int]
+    candidates_by_course: Dict[str, int]
+    active_jobs_by_company: Dict[str, int]
+    active_jobs_by_location: Dict[str, int]
+
+class AuditEventResponse(BaseModel):
+    id: int
+    actor_id: Optional[int]
+    actor: Optional[str]
+    action: str
+    entity: str
+    entity_id: Optional[int]
+    changes: Optional[Dict[str, Any]]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+# Bulk updates choose rows by ids or by filters (not both)
+class CandidateBulkStatusUpdate(BaseModel):
+    status: str
+    ids: Optional[List[int]] = None
+    current_status: Optional[str] = None
+    course_id: Optional[int] = None
+
+class JobBulkDeactivate(BaseModel):
+    ids: Optional[List[int]] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+
+class CourseBulkDeactivate(BaseModel):
+    ids: Optional[List[int]] = None
+    instructor: Optional[str] = None
+
+class BulkUpdateReport(BaseModel):
+    updated: int
+    unchanged: int
+    not_found: List[int]
+
+# Request profiles and slow queries (see app/profiling.py)
+class ProfiledQuery(BaseModel):
+    statement: str
+    parameters: Any
+    duration_ms: float
+
+class ProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    query_count: int
+    query_ms: float
+    created_at: datetime
+
+class ProfileResponse(ProfileSummary):
+    queries: List[ProfiledQuery]
+    profile: str
+
+class SlowQueryResponse(BaseModel):
+    id: int
+    route: Optional[str]
+    statement: str
+    parameters: Any
+    duration_ms: float
+    explain: Any
+    created_at: datetime
+
+# Duplicate-candidate report (see app/dedup.py)
+class DuplicateGroup(BaseModel):
+    score: float
+    reasons: List[str]
+    candidates: List[CandidateResponse]
+
+class DuplicateReport(BaseModel):
+    groups: List[DuplicateGroup]
+    total_groups: int
+    skipped_blocks: int
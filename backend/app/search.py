@@ -0,0 +1,252 @@
+import os
+import re
+import math
+import time
+import asyncio
+import contextvars
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+
+from .database import engine
+from .models import Job
+
+# auto picks MySQL FULLTEXT on MySQL and the in-process inverted index elsewhere (SQLite/tests)
+JOB_SEARCH_BACKEND = os.getenv("JOB_SEARCH_BACKEND", "auto")
+# Seconds between rebuilds of the in-process index from the database, so each worker also sees
+# jobs written by other workers (0 disables; only safe with a single worker)
+JOB_SEARCH_REFRESH_INTERVAL = float(os.getenv("JOB_SEARCH_REFRESH_INTERVAL", "60"))
+
+# Relative weight of a term hit in each searchable field
+FIELD_WEIGHTS = {"title": 3.0, "company": 2.0, "location": 2.0, "requirements": 1.0}
+SUMMARY_FIELDS = ("id", "title", "company", "location", "salary_range")
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class InvertedIndex:
+    """In-process BM25 index over active jobs, updated incrementally by the jobs router."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.doc_terms: Dict[int, List[str]] = {}
+        self.doc_lengths: Dict[int, float] = {}
+        self.summaries: Dict[int, dict] = {}
+        self.total_length = 0.0
+        self._scoring_avg_length = 1.0
+        self._impact_cache: Dict[str, tuple] = {}
+        self._max_job_id = 0
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+        self._pending = []
+
+    async def ensure_loaded(self, db):
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if self.loaded:
+                return
+            columns = [getattr(Job, name) for name in set(SUMMARY_FIELDS) | set(FIELD_WEIGHTS)]
+            result = await db.execute(select(*columns).filter(Job.is_active == True))
+            rows = result.all()
+            # Tokenizing every job is CPU work; keep the event loop serving requests meanwhile.
+            # Writes arriving until then are queued in _pending (the lock is held), not applied
+            await asyncio.to_thread(self._build, rows)
+            # Replay writes that landed while the snapshot was being read and indexed
+            for op, arg in self._pending:
+                self._apply_now(op, arg)
+            self._pending.clear()
+            self.loaded = True
+
+    def _build(self, rows):
+        for row in rows:
+            self.add(row)
+        # Build every term's impact list up front so queries never pay for a cold sort
+        if self.doc_lengths:
+            self._refresh_scoring_length()
+            for term in list(self.postings):
+                self._impacts(term)
+
+    def _apply_now(self, op: str, arg):
+        if op == "add":
+            self.add(arg)
+        else:
+            self.remove(arg)
+
+    def apply(self, op: str, arg):
+        if self.loaded:
+            self._apply_now(op, arg)
+        elif self._load_lock.locked():
+            self._pending.append((op, arg))
+
+    def add(self, job):
+        """Index (or re-index) a job; inactive jobs are removed instead."""
+        self.remove(job.id)
+        if getattr(job, "is_active", True) is False:
+            return
+        weights = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(job, field)):
+                weights[term] += weight
+        for term, tf in weights.items():
+            self.postings[term][job.id] = tf
+            self._impact_cache.pop(term, None)
+        length = sum(weights.values())
+        self.doc_terms[job.id] = list(weights)
+        self.doc_lengths[job.id] = length
+        self.total_length += length
+        self.summaries[job.id] = {field: getattr(job, field) for field in SUMMARY_FIELDS}
+        self._max_job_id = max(self._max_job_id, job.id)
+
+    def remove(self, job_id: int):
+        terms = self.doc_terms.pop(job_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            self._impact_cache.pop(term, None)
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(job_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(job_id, 0.0)
+        self.summaries.pop(job_id, None)
+
+    def _impacts(self, term: str):
+        """Per-term BM25 term-frequency components as (job ids, components) arrays, cached until the term changes."""
+        cached = self._impact_cache.get(term)
+        if cached is None:
+            postings = self.postings[term]
+            job_ids = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            lengths = np.fromiter((self.doc_lengths[job_id] for job_id in postings), dtype=np.float64, count=len(postings))
+            norms = self.k1 * (1 - self.b + self.b * lengths / self._scoring_avg_length)
+            cached = self._impact_cache[term] = (job_ids, tfs * (self.k1 + 1) / (tfs + norms))
+        return cached
+
+    def _refresh_scoring_length(self):
+        # Document-length normalisation uses a frozen average so cached impacts stay consistent;
+        # it is only refreshed (dropping every cache) once the real average drifts noticeably
+        avg_length = self.total_length / len(self.doc_lengths)
+        if abs(avg_length - self._scoring_avg_length) > 0.05 * avg_length:
+            self._scoring_avg_length = avg_length
+            self._impact_cache.clear()
+
+    def search(self, query: str, limit: int) -> List[dict]:
+        total_docs = len(self.doc_lengths)
+        if not total_docs:
+            return []
+        self._refresh_scoring_length()
+
+        # Scores accumulate in a dense array indexed by job id, so each term costs one vectorised add
+        scores = None
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            job_ids, components = self._impacts(term)
+            if scores is None:
+                scores = np.zeros(self._max_job_id + 1)
+            scores[job_ids] += idf * components
+        if scores is None:
+            return []
+
+        matches = np.flatnonzero(scores)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(scores[matches], -limit)[-limit:]]
+        # Best score first, newest job first among ties
+        ranked = matches[np.lexsort((-matches, -scores[matches]))]
+        return [dict(self.summaries[int(job_id)], score=round(float(scores[job_id]), 4)) for job_id in ranked]
+
+
+class JobSearch:
+    """Dispatches job search to MySQL FULLTEXT or the in-process inverted index.
+
+    The in-process index is per worker: the jobs router keeps it current with the
+    writes this worker handles, and it is rebuilt from the database every
+    ``refresh_interval`` seconds to pick up writes made by other workers.
+    """
+
+    def __init__(self, backend: str, refresh_interval: float = JOB_SEARCH_REFRESH_INTERVAL):
+        if backend == "auto":
+            backend = "mysql" if engine.dialect.name == "mysql" else "memory"
+        if backend not in ("mysql", "memory"):
+            raise ValueError(f"Unsupported JOB_SEARCH_BACKEND: {backend}")
+        self.backend = backend
+        self.index = InvertedIndex() if backend == "memory" else None
+        self.refresh_interval = refresh_interval
+        self.loaded_at = 0.0
+        # Index being rebuilt in the background; it receives writes too until it replaces self.index
+        self._next: Optional[InvertedIndex] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _apply(self, op: str, arg):
+        if self.index is not None:
+            self.index.apply(op, arg)
+        if self._next is not None:
+            self._next.apply(op, arg)
+
+    def index_job(self, job):
+        self._apply("add", job)
+
+    def remove_job(self, job_id: int):
+        self._apply("remove", job_id)
+
+    async def _refresh(self):
+        from .database import SessionLocal
+
+        index = InvertedIndex()
+        try:
+            async with SessionLocal() as db:
+                # ensure_loaded takes the new index's lock without yielding, so no write slips between
+                # publishing it here and its _pending queue taking over
+                self._next = index
+                await index.ensure_loaded(db)
+            self.index = index
+        except Exception as e:
+            # Keep serving the current index and retry after another interval
+            print(f"⚠️  Job search index refresh failed: {e}")
+        finally:
+            self._next = None
+            self.loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db):
+        if not self.index.loaded:
+            await self.index.ensure_loaded(db)
+            self.loaded_at = time.monotonic()
+            return
+        stale = self.refresh_interval and time.monotonic() - self.loaded_at > self.refresh_interval
+        if stale and self._next is None:
+            # Rebuild in the background (fresh context: no request state) while the current index serves
+            self._refresh_task = asyncio.create_task(self._refresh(), context=contextvars.Context())
+
+    async def search(self, db, query: str, limit: int) -> List[dict]:
+        if self.index is not None:
+            await self.ensure_loaded(db)
+            return self.index.search(query, limit)
+
+        score = match(
+            Job.title, Job.company, Job.location, Job.requirements, against=query
+        ).in_natural_language_mode()
+        columns = [getattr(Job, name) for name in SUMMARY_FIELDS]
+        result = await db.execute(
+            select(*columns, score.label("score"))
+            .filter(Job.is_active == True, score > 0)
+            .order_by(score.desc(), Job.id.desc())
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in result]
+
+
+job_search = JobSearch(JOB_SEARCH_BACKEND)
@@ -0,0 +1,165 @@
+from functools import lru_cache
+from operator import attrgetter
+import types
+from typing import Any, Dict, Optional, Sequence, Type, Union, get_args, get_origin
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+from .streaming import parse_fields
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson; ``bytes`` content is sent as-is (already serialized)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+
+def _is_nested(annotation) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_is_nested(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def _flat_fields(model: Type[BaseModel]) -> Optional[tuple]:
+    """Field names of a schema made only of scalar fields, or None if it nests other models."""
+    fields = model.model_fields
+    if any(_is_nested(field.annotation) for field in fields.values()):
+        return None
+    return tuple(fields)
+
+
+def _allows_none(annotation) -> bool:
+    if annotation is Any or annotation is None or annotation is type(None):
+        return True
+    return get_origin(annotation) in (Union, types.UnionType) and any(_allows_none(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def _nullable_required_fields(model: Type[BaseModel], row_type: type) -> tuple:
+    """Non-Optional fields of ``model`` that rows of ``row_type`` may still hold as None.
+
+    Fields backed by a NOT NULL column of a mapped class cannot be None and
+    need no check; anything else (nullable columns, unmapped rows) does.
+    """
+    mapper = inspect(row_type, raiseerr=False)
+    columns = mapper.columns if mapper is not None else {}
+    return tuple(
+        name for name, field in model.model_fields.items()
+        if not _allows_none(field.annotation) and (name not in columns or columns[name].nullable)
+    )
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _validated_json(data, response_type) -> bytes:
+    # Slow path: build the schema objects (reading ORM attributes), then serialize them
+    adapter = _adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def _row_getter(fields: tuple):
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda row: (getter(row),)
+    return getter
+
+
+def _row_to_dict(row, fields: tuple, getter) -> dict:
+    # Loaded ORM column values sit in the instance __dict__; reading them there skips the
+    # instrumented attribute descriptors, which dominate the cost for wide pages
+    state = getattr(row, "__dict__", None)
+    if state is not None:
+        try:
+            return {name: state[name] for name in fields}
+        except KeyError:
+            pass
+    return dict(zip(fields, getter(row)))
+
+
+def _has_missing_required(items: list, required: tuple) -> bool:
+    return any(item[name] is None for name in required for item in items)
+
+
+def dump_rows(rows, model: Type[BaseModel]) -> bytes:
+    """Serialize ORM rows as a JSON list of ``model`` without per-row Pydantic validation.
+
+    Rows come straight from typed columns, so the flat fast path only picks the
+    schema's fields and hands plain dicts to orjson. A NULL in a nullable column
+    behind a non-Optional field goes to Pydantic, which rejects it as the
+    response model would. Schemas with nested models fall back to Pydantic's
+    serializer.
+    """
+    fields = _flat_fields(model)
+    if fields is None:
+        return _validated_json(rows, list[model])
+    rows = list(rows)
+    getter = _row_getter(fields)
+    items = [_row_to_dict(row, fields, getter) for row in rows]
+    if items and _has_missing_required(items, _nullable_required_fields(model, type(rows[0]))):
+        return _validated_json(rows, list[model])
+    return orjson.dumps(items)
+
+
+def dump_row(row, model: Type[BaseModel]) -> bytes:
+    fields = _flat_fields(model)
+    if fields is None:
+        return _validated_json(row, model)
+    item = _row_to_dict(row, fields, _row_getter(fields))
+    if _has_missing_required([item], _nullable_required_fields(model, type(row))):
+        return _validated_json(row, model)
+    return orjson.dumps(item)
+
+
+def dump_json(data, response_type) -> bytes:
+    """Serialize ``data`` as ``response_type`` (a schema or ``List[schema]``), using the fast path when possible."""
+    if get_origin(response_type) is list:
+        (model,) = get_args(response_type)
+        if isinstance(model, type) and issubclass(model, BaseModel):
+            return dump_rows(data, model)
+    elif isinstance(response_type, type) and issubclass(response_type, BaseModel):
+        return dump_row(data, response_type)
+    return _validated_json(data, response_type)
+
+
+def rows_response(rows, model: Type[BaseModel], headers: Optional[Dict[str, str]] = None) -> FastJSONResponse:
+    return FastJSONResponse(dump_rows(rows, model), headers=headers)
+
+
+def select_fields(schema: Type[BaseModel], fields: Optional[str]) -> Optional[tuple]:
+    """Validate a ``?fields=`` selection against ``schema``; None (everything) when omitted.
+
+    Fields come back in schema order so equivalent selections share one trimmed schema.
+    """
+    if not fields:
+        return None
+    selected = set(parse_fields(fields, tuple(schema.model_fields)))
+    return tuple(name for name in schema.model_fields if name in selected)
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: Type[BaseModel], fields: tuple) -> Type[BaseModel]:
+    """``schema`` trimmed to ``fields`` (same types and config), for sparse fieldset responses."""
+    definitions = {name: (schema.model_fields[name].annotation, ...) for name in fields}
+    return create_model(f"{schema.__name__}Fields", __config__=schema.model_config, **definitions)
+
+
+def load_fields(model, fields: Sequence[str]):
+    """Loader option fetching only ``fields`` (plus the keyset columns id/created_at) from the table.
+
+    Other columns are never loaded; touching one raises instead of issuing a lazy query.
+    """
+    columns = dict.fromkeys(("id", "created_at", *fields))
+    return load_only(*[getattr(model, name) for name in columns], raiseload=True)
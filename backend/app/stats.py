@@ -0,0 +1,202 @@
+"""Dashboard statistics kept incrementally in the ``stat_counters`` table.
+
+Every candidate, job and course write adjusts the affected counters inside
+the same transaction (ORM mapper events for router writes, ``record_inserts``
+and ``record_updates`` for Core bulk statements), so ``GET /stats`` is a single small SELECT however
+large the tables grow. ``rebuild_stats`` recomputes everything from scratch
+for repair:
+
+    python -m app.stats rebuild
+"""
+import asyncio
+import sys
+from collections import Counter
+from typing import Dict, Iterable
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .models import Candidate, Course, Job, StatCounter
+
+TOTALS = "totals"
+CANDIDATES_BY_STATUS = "candidates_by_status"
+CANDIDATES_BY_COURSE = "candidates_by_course"
+ACTIVE_JOBS_BY_COMPANY = "active_jobs_by_company"
+ACTIVE_JOBS_BY_LOCATION = "active_jobs_by_location"
+DIMENSIONS = (TOTALS, CANDIDATES_BY_STATUS, CANDIDATES_BY_COURSE, ACTIVE_JOBS_BY_COMPANY, ACTIVE_JOBS_BY_LOCATION)
+
+# Attributes each model's counters depend on
+TRACKED_ATTRIBUTES = {
+    Candidate: ("status", "course_id"),
+    Job: ("is_active", "company", "location"),
+    Course: ("is_active",),
+}
+
+
+def _contributions(model, values: dict) -> Counter:
+    """Counters a row with ``values`` adds to (one each)."""
+    keys = Counter()
+    if model is Candidate:
+        keys[(TOTALS, "candidates")] += 1
+        if values["status"] is not None:
+            keys[(CANDIDATES_BY_STATUS, values["status"])] += 1
+        if values["course_id"] is not None:
+            keys[(CANDIDATES_BY_COURSE, str(values["course_id"]))] += 1
+    elif model is Job:
+        keys[(TOTALS, "jobs")] += 1
+        if values["is_active"]:
+            keys[(TOTALS, "active_jobs")] += 1
+            keys[(ACTIVE_JOBS_BY_COMPANY, values["company"])] += 1
+            if values["location"] is not None:
+                keys[(ACTIVE_JOBS_BY_LOCATION, values["location"])] += 1
+    elif model is Course:
+        keys[(TOTALS, "courses")] += 1
+        if values["is_active"]:
+            keys[(TOTALS, "active_courses")] += 1
+    return keys
+
+
+def _upsert(dialect_name: str, dimension: str, key: str, delta: int):
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql_insert(StatCounter).values(dimension=dimension, key=key, count=delta)
+        return stmt.on_duplicate_key_update(count=StatCounter.count + delta)
+    if dialect_name == "sqlite":
+        stmt = sqlite_insert(StatCounter).values(dimension=dimension, key=key, count=delta)
+        return stmt.on_conflict_do_update(index_elements=["dimension", "key"], set_={"count": StatCounter.count + delta})
+    return None
+
+
+def apply_deltas(connection, deltas: Counter):
+    """Add ``deltas`` to their counters on ``connection`` (a sync Connection, inside the write's transaction)."""
+    dialect_name = connection.dialect.name
+    # Sorted so concurrent writers take counter row locks in the same order
+    for (dimension, key), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        stmt = _upsert(dialect_name, dimension, key, delta)
+        if stmt is not None:
+            connection.execute(stmt)
+            continue
+        result = connection.execute(
+            update(StatCounter)
+            .filter(StatCounter.dimension == dimension, StatCounter.key == key)
+            .values(count=StatCounter.count + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(StatCounter).values(dimension=dimension, key=key, count=delta))
+
+
+def _current_values(model, target) -> dict:
+    return {name: getattr(target, name) for name in TRACKED_ATTRIBUTES[model]}
+
+
+def _previous_values(model, target) -> dict:
+    state = inspect(target)
+    values = {}
+    for name in TRACKED_ATTRIBUTES[model]:
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else getattr(target, name)
+    return values
+
+
+def _after_insert(mapper, connection, target):
+    model = mapper.class_
+    apply_deltas(connection, _contributions(model, _current_values(model, target)))
+
+
+def _after_update(mapper, connection, target):
+    model = mapper.class_
+    deltas = _contributions(model, _current_values(model, target))
+    deltas.subtract(_contributions(model, _previous_values(model, target)))
+    apply_deltas(connection, deltas)
+
+
+def _after_delete(mapper, connection, target):
+    model = mapper.class_
+    deltas = Counter()
+    deltas.subtract(_contributions(model, _previous_values(model, target)))
+    apply_deltas(connection, deltas)
+
+
+for _model in TRACKED_ATTRIBUTES:
+    event.listen(_model, "after_insert", _after_insert)
+    event.listen(_model, "after_update", _after_update)
+    event.listen(_model, "after_delete", _after_delete)
+
+
+async def record_inserts(db, model, rows: Iterable[dict]):
+    """Count rows written with a Core ``insert()``, which bypasses mapper events. Call before commit."""
+    deltas = Counter()
+    for row in rows:
+        values = {name: row.get(name, _column_default(model, name)) for name in TRACKED_ATTRIBUTES[model]}
+        deltas.update(_contributions(model, values))
+    connection = await db.connection()
+    await connection.run_sync(apply_deltas, deltas)
+
+
+async def record_updates(db, model, rows: Iterable[dict], values: dict):
+    """Count rows changed by a Core ``update()`` to ``values``; ``rows`` hold their previous tracked values.
+
+    Call before commit, in the same transaction as the update.
+    """
+    deltas = Counter()
+    for row in rows:
+        previous = {name: row[name] for name in TRACKED_ATTRIBUTES[model]}
+        deltas.update(_contributions(model, {**previous, **{name: values[name] for name in previous if name in values}}))
+        deltas.subtract(_contributions(model, previous))
+    connection = await db.connection()
+    await connection.run_sync(apply_deltas, deltas)
+
+
+def _column_default(model, name: str):
+    default = model.__table__.c[name].default
+    return default.arg if default is not None and default.is_scalar else None
+
+
+async def read_stats(db) -> Dict[str, Dict[str, int]]:
+    result = await db.execute(select(StatCounter.dimension, StatCounter.key, StatCounter.count).filter(StatCounter.count != 0))
+    stats = {dimension: {} for dimension in DIMENSIONS}
+    for dimension, key, count in result:
+        stats.setdefault(dimension, {})[key] = count
+    return stats
+
+
+async def rebuild_stats(db) -> Dict[str, Dict[str, int]]:
+    """Recompute every counter with GROUP BY queries and replace the table in one transaction."""
+    deltas = Counter()
+    result = await db.execute(select(Candidate.status, Candidate.course_id, func.count()).group_by(Candidate.status, Candidate.course_id))
+    for status, course_id, count in result:
+        for key, value in _contributions(Candidate, {"status": status, "course_id": course_id}).items():
+            deltas[key] += value * count
+    result = await db.execute(select(Job.is_active, Job.company, Job.location, func.count()).group_by(Job.is_active, Job.company, Job.location))
+    for is_active, company, location, count in result:
+        for key, value in _contributions(Job, {"is_active": is_active, "company": company, "location": location}).items():
+            deltas[key] += value * count
+    result = await db.execute(select(Course.is_active, func.count()).group_by(Course.is_active))
+    for is_active, count in result:
+        for key, value in _contributions(Course, {"is_active": is_active}).items():
+            deltas[key] += value * count
+
+    await db.execute(delete(StatCounter))
+    if deltas:
+        await db.execute(insert(StatCounter), [
+            {"dimension": dimension, "key": key, "count": count} for (dimension, key), count in deltas.items()
+        ])
+    await db.commit()
+    return await read_stats(db)
+
+
+async def _main(argv):
+    from .database import SessionLocal
+
+    if argv[1:] != ["rebuild"]:
+        print(__doc__)
+        sys.exit(2)
+    async with SessionLocal() as db:
+        stats = await rebuild_stats(db)
+    print(f"Rebuilt {sum(len(counters) for counters in stats.values())} counters")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv))
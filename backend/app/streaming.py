@@ -0,0 +1,153 @@
+import io
+import os
+import csv
+import json
+import codecs
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from .database import read_sessionmaker
+
+# Bulk uploads/exports are CSV (with a header row) or newline-delimited JSON
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# Rows fetched per server-side cursor round trip (and per chunk written to the client)
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    if explicit:
+        return explicit
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return "ndjson" if media_type in NDJSON_MEDIA_TYPES else "csv"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield its lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        if "\n" not in pending:
+            continue
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple]:
+    """Yield ``(row_number, dict | error)`` from CSV lines; the first record is the header.
+
+    Quoted fields may span lines: physical lines are joined until the quotes balance.
+    """
+    header = None
+    record = []
+    quotes = 0
+    row_number = 0
+    async for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield row_number, {name: (value.strip() or None) for name, value in zip(header, values)}
+    if record:
+        yield row_number + 1, ValueError("Unterminated quoted field")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple]:
+    """Yield ``(row_number, dict | error)`` from newline-delimited JSON lines."""
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(value, dict):
+            yield row_number, ValueError("Expected a JSON object")
+            continue
+        yield row_number, value
+
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple]:
+    lines = iter_lines(chunks)
+    return iter_ndjson_records(lines) if fmt == "ndjson" else iter_csv_records(lines)
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], param: str = "fields") -> List[str]:
+    """Validate a comma-separated ``?fields=`` (or ``param``) selection; all allowed fields when omitted."""
+    if not fields:
+        return list(allowed)
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in allowed]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {param}: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return selected
+
+
+def _export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_rows(rows, fields: List[str], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps({name: _export_value(value) for name, value in zip(fields, row)}) + "\n" for row in rows
+        ).encode("utf-8")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def iter_export(stmt, fields: List[str], fmt: str, session_factory) -> AsyncIterator[bytes]:
+    # The session is owned by the generator because the response body outlives the request's dependencies
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        if fmt == "csv":
+            yield encode_rows([fields], fields, "csv")
+        async for rows in result.partitions():
+            yield encode_rows(rows, fields, fmt)
+
+
+def export_response(model, fields: List[str], fmt: str, filename: str,
+                    created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> StreamingResponse:
+    """Stream the selected ``fields`` of ``model`` as CSV or NDJSON with memory bounded by one chunk."""
+    stmt = select(*[getattr(model, name) for name in fields]).order_by(model.id)
+    if created_from is not None:
+        stmt = stmt.filter(model.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.filter(model.created_at < created_to)
+    return StreamingResponse(
+        iter_export(stmt, fields, fmt, read_sessionmaker()),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
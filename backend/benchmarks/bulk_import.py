@@ -0,0 +1,73 @@
+"""Rows/sec of the streaming candidate import vs one POST /candidates/ per row.
+
+    python -m benchmarks.bulk_import --rows 20000 --per-row-sample 500
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import insert
+
+from .common import admin_headers, make_client, reset_schema
+
+# Rows reference course ids 1..COURSES, which the import and POST /candidates/ validate
+COURSES = 4
+
+
+async def seed_courses():
+    from app.database import SessionLocal
+    from app.models import Course
+
+    async with SessionLocal() as db:
+        await db.execute(insert(Course), [
+            {"title": f"Course {i}", "duration": "3 months", "instructor": f"Instructor {i}", "is_active": True}
+            for i in range(COURSES)
+        ])
+        await db.commit()
+
+
+async def csv_body(rows: int, prefix: str, chunk_rows: int = 1000):
+    yield b"name,email,phone,course_id\n"
+    for start in range(0, rows, chunk_rows):
+        yield "".join(
+            f"Student {i},{prefix}{i}@example.com,98765{i % 100000:05d},{i % COURSES + 1}\n"
+            for i in range(start, min(rows, start + chunk_rows))
+        ).encode("utf-8")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--per-row-sample", type=int, default=500)
+    args = parser.parse_args()
+
+    await reset_schema()
+    await seed_courses()
+    async with make_client() as client:
+        headers = await admin_headers(client)
+
+        start = time.perf_counter()
+        response = await client.post("/candidates/import", content=csv_body(args.rows, "bulk"),
+                                     headers=dict(headers, **{"Content-Type": "text/csv"}), timeout=None)
+        bulk_elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        report = response.json()
+
+        start = time.perf_counter()
+        for i in range(args.per_row_sample):
+            (await client.post("/candidates/", headers=headers, json={
+                "name": f"Student {i}", "email": f"single{i}@example.com", "course_id": 1,
+            })).raise_for_status()
+        per_row_elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "rows": args.rows,
+        "inserted": report["inserted"],
+        "bulk_rows_per_sec": round(report["inserted"] / bulk_elapsed, 1),
+        "per_row_rows_per_sec": round(args.per_row_sample / per_row_elapsed, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
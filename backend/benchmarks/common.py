@@ -0,0 +1,73 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run the app in-process over httpx's ASGI transport against a
+throwaway SQLite (aiosqlite) database, so no MySQL server is needed.
+"""
+import os
+import tempfile
+import time
+
+# Point the app at a scratch database before anything imports app.database
+BENCH_DB_PATH = os.getenv("BENCH_DB_PATH", os.path.join(tempfile.gettempdir(), "codexa_bench.db"))
+# SQLite has a single writer; wait for the lock like MySQL would instead of failing after the default 5s
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{BENCH_DB_PATH}?timeout=30")
+# Benchmarks drive many requests from one client address; the limiter has its own benchmark
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+from sqlalchemy import update
+
+
+async def reset_schema():
+    from app.database import engine
+    from app.models import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def make_client():
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def admin_headers(client):
+    """Register and log in an admin user, returning its Authorization header."""
+    from app.database import SessionLocal
+    from app.models import User
+
+    await client.post("/auth/register", json={"email": "bench@codexa.com", "username": "bench", "password": "bench"})
+    async with SessionLocal() as db:
+        await db.execute(update(User).values(is_admin=True))
+        await db.commit()
+    response = await client.post("/auth/login", json={"username": "bench", "password": "bench"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,87 @@
+"""Concurrent-request throughput for the public list/detail endpoints.
+
+By default the app runs in-process against a seeded SQLite database. To
+compare two revisions (e.g. before and after the move to the async data
+layer), start each one under uvicorn against the same MySQL database and
+point the benchmark at it:
+
+    python -m benchmarks.concurrency --requests 2000 --concurrency 50
+    RESPONSE_CACHE_MAX_ENTRIES=0 uvicorn app.main:app  # then:
+    python -m benchmarks.concurrency --url http://localhost:8000
+
+Every request hits the same URL, so the catalog response cache would answer
+all but the first one from memory. The in-process app therefore runs with the
+cache disabled (RESPONSE_CACHE_MAX_ENTRIES=0); start servers under test the
+same way. Pass --cached to measure cache hits instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Measure the database path, not the response cache (see above)
+if "--cached" not in sys.argv:
+    os.environ.setdefault("RESPONSE_CACHE_MAX_ENTRIES", "0")
+
+import httpx
+
+from .common import make_client, reset_schema, summarize
+
+
+async def seed(jobs: int):
+    from app.database import SessionLocal
+    from app.models import Job
+
+    async with SessionLocal() as db:
+        db.add_all([
+            Job(title=f"Engineer {i}", company=f"Company {i % 50}", location="Pune",
+                description="Build things", requirements="Python, SQL", salary_range="₹6-10 LPA")
+            for i in range(jobs)
+        ])
+        await db.commit()
+
+
+async def run(total: int, concurrency: int, path: str, url: str = None):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(path)
+
+    client = httpx.AsyncClient(base_url=url) if url else make_client()
+    async with client:
+        async def worker():
+            while not queue.empty():
+                url = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--path", default="/jobs/?limit=20")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--cached", action="store_true", help="Keep the catalog response cache enabled in-process")
+    args = parser.parse_args()
+
+    if not args.url:
+        await reset_schema()
+        await seed(args.jobs)
+    result = await run(args.requests, args.concurrency, args.path, args.url)
+    result.update({"path": args.path, "concurrency": args.concurrency})
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+"""Duplicate-candidate detection at scale: the /candidates/duplicates report and the insert-time check.
+
+    python -m benchmarks.dedup --candidates 500000 --duplicates 0.01
+
+Seeds distinct candidates plus a share of re-registrations: the same person
+with a new email, the phone reformatted (or, for some, replaced) and the name
+reordered or recased. It reports the report's latency, recall/precision
+against the planted duplicates, how many pairs blocking compared versus all
+pairs, and the p50/p95 of POST /candidates/ with the duplicate check.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import func, insert, select
+
+from .common import admin_headers, make_client, percentile, reset_schema
+
+SYLLABLES = ["ra", "vi", "an", "ka", "sh", "mi", "pr", "ya", "de", "ep", "su", "ni", "ta", "ar", "jun", "ma",
+             "ha", "ri", "ne", "ha", "po", "oj", "sa", "ch", "in", "ku", "al", "ro", "hi", "ta"]
+SURNAMES = ["Sharma", "Patil", "Kulkarni", "Deshmukh", "Joshi", "Pawar", "Shinde", "Jadhav", "Chavan", "More",
+            "Gaikwad", "Kale", "Bhosale", "Naik", "Rao", "Reddy", "Iyer", "Nair", "Menon", "Gupta", "Singh",
+            "Verma", "Mehta", "Shah", "Desai", "Kapoor", "Malhotra", "Khanna", "Bose", "Das", "Sen", "Ghosh",
+            "Mukherjee", "Banerjee", "Pillai", "Kumar", "Yadav", "Mishra", "Tiwari", "Pandey"]
+
+
+def person(rng: random.Random, i: int) -> dict:
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    middle = "".join(rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+    name = f"{first} {middle} {rng.choice(SURNAMES)}"
+    return {"name": name, "email": f"{first.lower()}.{i}@example.com", "phone": f"9{rng.randrange(10 ** 9):09d}",
+            "status": "pending"}
+
+
+def reregistration(rng: random.Random, original: dict, i: int) -> dict:
+    """The same person again, the way a second sign-up actually differs."""
+    parts = original["name"].split()
+    name = rng.choice([
+        f"{parts[-1]}, {' '.join(parts[:-1])}",
+        original["name"].upper(),
+        f"Mr. {original['name']}",
+        original["name"].lower(),
+    ])
+    phone = original["phone"]
+    if rng.random() < 0.2:
+        phone = f"9{rng.randrange(10 ** 9):09d}"  # New number; only the name links them
+    else:
+        phone = rng.choice([f"+91 {phone[:5]} {phone[5:]}", f"0{phone}", f"{phone[:3]}-{phone[3:6]}-{phone[6:]}"])
+    local = original["email"].split("@")[0]
+    email = rng.choice([f"{local}{i}@gmail.com", f"{local.replace('.', '')}+{i}@yahoo.in"])
+    return {"name": name, "email": email, "phone": phone, "status": "pending"}
+
+
+async def seed(candidates: int, duplicate_share: float, rng: random.Random, batch: int = 10000):
+    """Insert the candidates; returns the planted (original id, duplicate id) pairs."""
+    from app.database import SessionLocal
+    from app.dedup import derived_candidate_values
+    from app.models import Candidate
+
+    duplicates = int(candidates * duplicate_share)
+    originals = candidates - duplicates
+    rows = [person(rng, i) for i in range(originals)]
+    planted = []
+    for i in range(duplicates):
+        original_index = rng.randrange(originals)
+        rows.append(reregistration(rng, rows[original_index], i))
+        # Ids follow insertion order on a fresh table
+        planted.append((original_index + 1, len(rows)))
+    # Core inserts skip the mapper event that fills the blocking keys
+    for row in rows:
+        row.update(derived_candidate_values(row["name"], row["phone"]))
+    async with SessionLocal() as db:
+        for offset in range(0, len(rows), batch):
+            await db.execute(insert(Candidate), rows[offset:offset + batch])
+        await db.commit()
+    return planted
+
+
+async def blocked_pairs() -> int:
+    """Pairs the blocking keys make the report compare (at most, before de-duplicating pairs sharing both keys)."""
+    from app.database import SessionLocal
+    from app.dedup import DEDUP_MAX_BLOCK_SIZE
+    from app.models import Candidate
+
+    total = 0
+    async with SessionLocal() as db:
+        for column in (Candidate.phone_key, Candidate.name_key):
+            sizes = select(func.count().label("size")).where(column.isnot(None)).group_by(column).subquery()
+            result = await db.execute(
+                select(func.coalesce(func.sum(sizes.c.size * (sizes.c.size - 1) / 2), 0))
+                .where(sizes.c.size.between(2, DEDUP_MAX_BLOCK_SIZE))
+            )
+            total += int(result.scalar())
+    return total
+
+
+async def all_groups():
+    from app.database import SessionLocal
+    from app.dedup import find_duplicates
+
+    async with SessionLocal() as db:
+        groups, _ = await find_duplicates(db)
+    return [[candidate.id for candidate in group["candidates"]] for group in groups]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=500000)
+    parser.add_argument("--duplicates", type=float, default=0.01, help="Share of candidates that are re-registrations")
+    parser.add_argument("--inserts", type=int, default=200, help="POST /candidates/ calls timed with the duplicate check")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    await reset_schema()
+    start = time.perf_counter()
+    planted = await seed(args.candidates, args.duplicates, rng)
+    seed_seconds = time.perf_counter() - start
+
+    async with make_client() as client:
+        headers = await admin_headers(client)
+        report_samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            response = await client.get("/candidates/duplicates", headers=headers)
+            report_samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+        report = response.json()
+
+        # The endpoint returns the top groups only; score recall/precision on all of them
+        groups = await all_groups()
+        group_of = {id: index for index, ids in enumerate(groups) for id in ids}
+        matched = [group_of[a] for a, b in planted if a in group_of and group_of[a] == group_of.get(b)]
+
+        insert_samples, flagged = [], 0
+        for i in range(args.inserts):
+            # Every other insert re-registers an existing candidate
+            body = person(rng, args.candidates + i)
+            if i % 2:
+                original = (await client.get(f"/candidates/{rng.randrange(1, args.candidates)}", headers=headers)).json()
+                body = reregistration(rng, original, args.candidates + i)
+            body.pop("status")
+            start = time.perf_counter()
+            response = await client.post("/candidates/", json=body, headers=headers)
+            insert_samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+            flagged += i % 2 == 1 and "x-possible-duplicates" in response.headers
+
+    total = args.candidates
+    print(json.dumps({
+        "candidates": total,
+        "planted_duplicates": len(planted),
+        "seed_seconds": round(seed_seconds, 1),
+        "report_p50_ms": round(percentile(report_samples, 50) * 1000, 1),
+        "groups": report["total_groups"],
+        "skipped_blocks": report["skipped_blocks"],
+        "recall": round(len(matched) / len(planted), 3) if planted else None,
+        "precision": round(len(set(matched)) / len(groups), 3) if groups else None,
+        "pairs_compared": await blocked_pairs(),
+        "all_pairs": total * (total - 1) // 2,
+        "insert_p50_ms": round(percentile(insert_samples, 50) * 1000, 2),
+        "insert_p95_ms": round(percentile(insert_samples, 95) * 1000, 2),
+        "reregistrations_flagged": f"{flagged}/{args.inserts // 2}",
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
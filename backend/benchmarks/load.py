@@ -0,0 +1,262 @@
+"""Reproducible load benchmark for the API.
+
+Boots ``app.main:app`` in-process against a freshly seeded SQLite database,
+drives each scenario at a fixed concurrency and reports throughput and
+p50/p95/p99 latency. Results are written as JSON; pass ``--baseline`` to
+fail (exit code 1) when a scenario regresses beyond ``--max-regression``.
+
+``benchmarks/baseline.json`` is the committed baseline for the default
+settings. Latencies depend on the machine, so regenerate it on the machine
+that runs the check (``benchmarks/results/`` is ignored for scratch runs):
+
+    python -m benchmarks.load --output benchmarks/baseline.json
+    python -m benchmarks.load --baseline benchmarks/baseline.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from sqlalchemy import insert
+
+from .common import admin_headers, make_client, reset_schema, summarize
+
+BENCH_PASSWORD = "bench-password"
+# Items on the simulated saved-jobs page (one batch request vs one request each)
+SAVED_JOBS = 20
+
+
+async def seed(jobs: int, courses: int, candidates: int, users: int, rng: random.Random):
+    from app.auth import get_password_hash
+    from app.database import SessionLocal
+    from app.dedup import derived_candidate_values
+    from app.facets import derived_job_values
+    from app.models import Candidate, Course, Job, User
+
+    # One hash shared by every seeded user keeps seeding fast at any bcrypt cost
+    hashed_password = await get_password_hash(BENCH_PASSWORD)
+    async with SessionLocal() as db:
+        if courses:
+            await db.execute(insert(Course), [
+                {"title": f"Course {i}", "description": "Learn things " * 10, "duration": "3 months",
+                 "price": "₹15,000", "instructor": f"Instructor {i % 20}", "is_active": True}
+                for i in range(courses)
+            ])
+        for offset in range(0, jobs, 10000):
+            rows = [
+                {"title": f"Engineer {i}", "company": f"Company {i % 200}", "location": rng.choice(["Pune", "Mumbai", "Bangalore"]),
+                 "description": "Build things " * 30, "requirements": "Python, SQL, Git",
+                 "salary_range": rng.choice(["₹3-5 LPA", "₹6-10 LPA", "₹12-18 LPA"]), "is_active": True}
+                for i in range(offset, min(jobs, offset + 10000))
+            ]
+            # Core inserts skip the mapper event that fills the facet columns
+            for row in rows:
+                row.update(derived_job_values(row["company"], row["location"], row["salary_range"]))
+            await db.execute(insert(Job), rows)
+        for offset in range(0, candidates, 10000):
+            rows = [
+                {"name": f"Student {i}", "email": f"student{i}@example.com", "phone": f"98{i:08d}",
+                 "course_id": (i % courses) + 1 if courses else None, "status": "pending"}
+                for i in range(offset, min(candidates, offset + 10000))
+            ]
+            for row in rows:
+                row.update(derived_candidate_values(row["name"], row["phone"]))
+            await db.execute(insert(Candidate), rows)
+        if users:
+            await db.execute(insert(User), [
+                {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": hashed_password,
+                 "full_name": f"User {i}", "is_active": True, "is_admin": False}
+                for i in range(users)
+            ])
+        await db.commit()
+
+
+async def rebuild_counters():
+    # Seeding uses Core inserts, so build the dashboard counters once afterwards
+    from app.database import SessionLocal
+    from app.stats import rebuild_stats
+
+    async with SessionLocal() as db:
+        await rebuild_stats(db)
+
+
+def build_scenarios(ctx: dict):
+    """Each scenario maps a name to ``async (client, rng) -> response``."""
+    headers = ctx["headers"]
+
+    async def login(client, rng):
+        username = f"user{rng.randrange(ctx['users'])}"
+        return await client.post("/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+
+    async def list_jobs(client, rng):
+        return await client.get("/jobs/", params={"limit": 20, "skip": rng.randrange(0, max(ctx["jobs"] - 20, 1), 20)})
+
+    async def list_courses(client, rng):
+        return await client.get("/courses/", params={"limit": 20})
+
+    async def list_candidates(client, rng):
+        return await client.get("/candidates/", params={"limit": 50}, headers=headers)
+
+    async def filter_jobs(client, rng):
+        return await client.get("/jobs/", params={"limit": 20, "cursor": "", "location": rng.choice(["Pune", "Mumbai"]),
+                                                  "min_salary": 800000})
+
+    async def job_facets(client, rng):
+        return await client.get("/jobs/facets", params={"location": rng.choice(["Pune", "Mumbai", "Bangalore"])})
+
+    async def job_detail(client, rng):
+        return await client.get(f"/jobs/{rng.randrange(ctx['jobs']) + 1}")
+
+    async def course_detail(client, rng):
+        return await client.get(f"/courses/{rng.randrange(ctx['courses']) + 1}")
+
+    def saved_job_ids(rng):
+        return [rng.randrange(ctx["jobs"]) + 1 for _ in range(SAVED_JOBS)]
+
+    async def saved_jobs_batch(client, rng):
+        # The saved-jobs page in one request: GET /jobs/?ids=...
+        return await client.get("/jobs/", params={"ids": ",".join(map(str, saved_job_ids(rng)))})
+
+    async def saved_jobs_one_by_one(client, rng):
+        # The same page as one GET /jobs/{id} per item, for comparison
+        for job_id in saved_job_ids(rng):
+            response = await client.get(f"/jobs/{job_id}")
+            if response.status_code >= 400:
+                break
+        return response
+
+    async def create_job(client, rng):
+        return await client.post("/jobs/", headers=headers, json={
+            "title": "Benchmark Engineer", "company": "Bench Corp", "location": "Pune",
+            "requirements": "Python", "salary_range": "₹6-10 LPA",
+        })
+
+    async def dashboard_stats(client, rng):
+        return await client.get("/stats/", headers=headers)
+
+    async def update_candidate(client, rng):
+        return await client.put(f"/candidates/{rng.randrange(ctx['candidates']) + 1}", headers=headers,
+                                json={"status": rng.choice(["pending", "enrolled", "completed"])})
+
+    scenarios = {
+        "list_jobs": list_jobs,
+        "list_courses": list_courses,
+        "filter_jobs": filter_jobs,
+        "job_facets": job_facets,
+        "job_detail": job_detail,
+        "saved_jobs_batch": saved_jobs_batch,
+        "saved_jobs_one_by_one": saved_jobs_one_by_one,
+        "create_job": create_job,
+        "dashboard_stats": dashboard_stats,
+    }
+    if ctx["users"]:
+        scenarios["login"] = login
+    if ctx["courses"]:
+        scenarios["course_detail"] = course_detail
+    if ctx["candidates"]:
+        scenarios["list_candidates"] = list_candidates
+        scenarios["update_candidate"] = update_candidate
+    return scenarios
+
+
+async def run_scenario(client, scenario, requests: int, concurrency: int, seed: int):
+    latencies = []
+    errors = 0
+    remaining = [requests]
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, rng)
+            except Exception as e:
+                # The in-process app re-raises server errors; count them instead of aborting the run
+                latencies.append(time.perf_counter() - start)
+                errors += 1
+                print(f"{type(e).__name__}: {e}".splitlines()[0], file=sys.stderr)
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - start)
+    result["errors"] = errors
+    return result
+
+
+def compare(results: dict, baseline: dict, max_regression: float):
+    """Return human-readable regressions of p95 latency or throughput beyond the tolerance."""
+    failures = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            failures.append(f"{name}: throughput {current['throughput_rps']} rps vs baseline {previous['throughput_rps']} rps")
+        if current["errors"] > previous.get("errors", 0):
+            failures.append(f"{name}: {current['errors']} errors vs baseline {previous.get('errors', 0)}")
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scenarios", help="Comma-separated subset of scenarios to run")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed fractional regression")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    await reset_schema()
+    await seed(args.jobs, args.courses, args.candidates, args.users, rng)
+    await rebuild_counters()
+
+    results = {
+        "config": {key: getattr(args, key) for key in ("jobs", "courses", "candidates", "users", "requests", "concurrency", "seed")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "scenarios": {},
+    }
+    async with make_client() as client:
+        ctx = {"headers": await admin_headers(client), "jobs": args.jobs, "courses": args.courses,
+               "candidates": args.candidates, "users": args.users}
+        scenarios = build_scenarios(ctx)
+        selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+        for name in selected:
+            results["scenarios"][name] = await run_scenario(client, scenarios[name], args.requests, args.concurrency, args.seed)
+            print(f"{name:>18}: {json.dumps(results['scenarios'][name])}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.max_regression)
+        if failures:
+            print("Performance regressions:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+        print(f"No regressions beyond {args.max_regression:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Page-N latency of offset vs keyset (cursor) pagination on GET /jobs.
+
+    python -m benchmarks.pagination --rows 1000000
+
+Offset pages get slower with depth because the database still walks the
+skipped rows; cursor pages should stay flat. Each sample requests the same
+URL, so the catalog response cache is cleared before every request; otherwise
+all but the first would be cache hits at any depth.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from .common import make_client, percentile, reset_schema
+
+
+async def seed(rows: int, batch: int = 10000):
+    from app.database import SessionLocal
+    from app.models import Job
+
+    start = datetime(2024, 1, 1)
+    async with SessionLocal() as db:
+        for offset in range(0, rows, batch):
+            await db.execute(insert(Job), [
+                {"title": f"Engineer {i}", "company": f"Company {i % 500}", "location": "Pune",
+                 "description": "Build things", "requirements": "Python, SQL", "salary_range": "₹6-10 LPA",
+                 "is_active": True, "created_at": start + timedelta(seconds=i)}
+                for i in range(offset, min(rows, offset + batch))
+            ])
+        await db.commit()
+
+
+async def cursor_at(depth: int) -> str:
+    """Cursor that resumes right after the ``depth``-th row of the newest-first listing."""
+    from app.database import SessionLocal
+    from app.models import Job
+    from app.pagination import encode_cursor
+
+    if depth == 0:
+        return ""
+    async with SessionLocal() as db:
+        row = (await db.execute(
+            select(Job.created_at, Job.id).filter(Job.is_active == True)
+            .order_by(Job.created_at.desc(), Job.id.desc()).offset(depth - 1).limit(1)
+        )).first()
+    return encode_cursor(row.created_at, row.id)
+
+
+async def time_requests(client, url: str, repeat: int):
+    from app.response_cache import catalog_cache
+
+    samples = []
+    for _ in range(repeat):
+        catalog_cache.clear()
+        start = time.perf_counter()
+        response = await client.get(url)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return round(percentile(samples, 50) * 1000, 2)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    await reset_schema()
+    await seed(args.rows)
+
+    results = []
+    async with make_client() as client:
+        for fraction in (0, 0.1, 0.5, 0.9):
+            depth = int(args.rows * fraction)
+            cursor = await cursor_at(depth)
+            results.append({
+                "depth": depth,
+                "offset_p50_ms": await time_requests(client, f"/jobs/?skip={depth}&limit={args.limit}", args.repeat),
+                "cursor_p50_ms": await time_requests(client, f"/jobs/?cursor={cursor}&limit={args.limit}", args.repeat),
+            })
+    print(json.dumps({"rows": args.rows, "limit": args.limit, "pages": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Check that embedding related rows does not reintroduce N+1 queries.
+
+Seeds candidates spread over many courses, then counts the SQL statements
+issued by ``GET /candidates/?include=course``, its ``?ids=`` batch form and
+``GET /courses/{id}/candidates`` at growing page sizes. Exits with code 1
+if the count changes with the page size; ``tests/test_query_count.py``
+runs the same check under pytest.
+
+    python -m benchmarks.query_count
+"""
+import argparse
+import asyncio
+import sys
+from typing import Dict, List
+
+from sqlalchemy import event, insert
+
+from .common import admin_headers, make_client, reset_schema
+
+
+async def seed(courses: int, candidates: int):
+    from app.database import SessionLocal
+    from app.models import Candidate, Course
+
+    async with SessionLocal() as db:
+        await db.execute(insert(Course), [
+            {"title": f"Course {i}", "duration": "3 months", "instructor": f"Instructor {i}", "is_active": True}
+            for i in range(courses)
+        ])
+        await db.execute(insert(Candidate), [
+            {"name": f"Student {i}", "email": f"student{i}@example.com", "course_id": (i % courses) + 1, "status": "pending"}
+            for i in range(candidates)
+        ])
+        await db.commit()
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+async def measure(page_sizes: List[int], courses: int = 100, candidates: int = 1000) -> Dict[str, Dict[int, int]]:
+    """Seed a fresh database and return the statement count per endpoint and page size."""
+    from app.database import engine
+    from app.pagination import BATCH_MAX_IDS
+
+    await reset_schema()
+    await seed(courses, candidates)
+
+    results = {}
+    async with make_client() as client:
+        headers = await admin_headers(client)
+        # Warm the principal cache so authentication does not add a query to the first request
+        await client.get("/candidates/", params={"limit": 1}, headers=headers)
+        endpoints = {
+            "/candidates/?include=course": ("/candidates/", {"include": "course"}),
+            "/candidates/?include=course&cursor=": ("/candidates/", {"include": "course", "cursor": ""}),
+            "/courses/1/candidates": ("/courses/1/candidates", {}),
+            "/candidates/?ids=&include=course": ("/candidates/", {"include": "course", "ids": None}),
+        }
+        for name, (path, params) in endpoints.items():
+            counts = results[name] = {}
+            for size in page_sizes:
+                if "ids" in params:
+                    # Batch lookups are capped at BATCH_MAX_IDS; spread the ids over the whole table
+                    count = min(size, BATCH_MAX_IDS)
+                    params = dict(params, ids=",".join(str(1 + i * (candidates // count)) for i in range(count)))
+                with QueryCounter(engine) as counter:
+                    response = await client.get(path, params=dict(params, limit=size), headers=headers)
+                response.raise_for_status()
+                counts[size] = counter.count
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--page-sizes", default="10,50,100,500")
+    args = parser.parse_args()
+
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    results = await measure(page_sizes, args.courses, args.candidates)
+
+    failures = []
+    for name, counts in results.items():
+        print(f"{name:>38}: " + ", ".join(f"limit={size} -> {count} queries" for size, count in counts.items()))
+        if len(set(counts.values())) > 1:
+            failures.append(name)
+
+    if failures:
+        print("Query count grows with page size for: " + ", ".join(failures))
+        sys.exit(1)
+    print("Query counts are constant across page sizes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
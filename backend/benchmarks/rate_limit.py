@@ -0,0 +1,78 @@
+"""Overhead of the rate limiter, per check and per request.
+
+Measures ``RateLimiter.hit`` directly for the in-process backend and the
+shared-store backend (with MemoryStore standing in for Redis), spread over
+many client keys. It then compares a trivial ASGI app called directly with
+the same app wrapped in ``RateLimitMiddleware``, for a limited route and an
+unlimited one.
+
+    python -m benchmarks.rate_limit --checks 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from .common import percentile
+
+
+async def bench_backend(limiter, rule, checks: int, clients: int):
+    latencies = []
+    for i in range(checks):
+        start = time.perf_counter()
+        await limiter.hit(rule, f"ip:10.0.{i % clients // 256}.{i % 256}")
+        latencies.append(time.perf_counter() - start)
+    return {
+        "checks": checks,
+        "mean_us": round(sum(latencies) / checks * 1e6, 2),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 2),
+    }
+
+
+async def bench_middleware(app, path: str, requests: int):
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [], "client": ("10.0.0.1", 1234)}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=10000)
+    args = parser.parse_args()
+
+    from app.cache import MemoryStore
+    from app.ratelimit import MemoryRateLimitBackend, RateLimiter, RateLimitMiddleware, StoreRateLimitBackend, parse_rules
+
+    # A limit no client reaches, so every check takes the "allowed" path
+    rules = parse_rules(f"GET /jobs/={args.checks}/minute:ip")
+    results = {
+        "memory": await bench_backend(RateLimiter(rules, MemoryRateLimitBackend(args.clients * 2)), rules[0], args.checks, args.clients),
+        "shared_store": await bench_backend(RateLimiter(rules, StoreRateLimitBackend(MemoryStore())), rules[0], args.checks, args.clients),
+    }
+
+    async def bare_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+
+    limited = RateLimitMiddleware(bare_app, RateLimiter(rules, MemoryRateLimitBackend(args.clients)))
+    requests = min(args.checks, 50000)
+    bare = await bench_middleware(bare_app, "/jobs/", requests)
+    results["middleware_overhead_us"] = {
+        "limited_route": round(await bench_middleware(limited, "/jobs/", requests) - bare, 2),
+        "unlimited_route": round(await bench_middleware(limited, "/courses/", requests) - bare, 2),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
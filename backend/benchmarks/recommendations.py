@@ -0,0 +1,123 @@
+"""Latency of GET /candidates/{id}/recommended-jobs against a large seeded job table.
+
+    python -m benchmarks.recommendations --jobs 100000 --courses 200 --requests 500
+
+Reports the first request (which builds the skill index), a course's first
+ranking (cache miss), repeat requests for the same course (cache hits), and,
+for comparison, parsing and scoring every job in plain Python for one course.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+from sqlalchemy import insert
+
+from .common import admin_headers, make_client, percentile, reset_schema
+from .search import CITIES, COMPANIES, SKILLS, TITLES
+
+
+async def seed(jobs: int, courses: int, rng: random.Random, batch: int = 10000):
+    from app.database import SessionLocal
+    from app.models import Candidate, Course, Job
+
+    async with SessionLocal() as db:
+        await db.execute(insert(Course), [
+            {"title": f"{rng.choice(SKILLS)} Bootcamp {i}", "duration": "3 months", "instructor": f"Instructor {i}",
+             "description": f"Hands-on {', '.join(rng.sample(SKILLS, 5))} with projects.", "is_active": True}
+            for i in range(courses)
+        ])
+        # One candidate per course, so candidate i is enrolled in course i
+        await db.execute(insert(Candidate), [
+            {"name": f"Student {i}", "email": f"student{i}@example.com", "course_id": i + 1, "status": "enrolled"}
+            for i in range(courses)
+        ])
+        for offset in range(0, jobs, batch):
+            await db.execute(insert(Job), [
+                {"title": f"{rng.choice(SKILLS)} {rng.choice(TITLES)}", "company": rng.choice(COMPANIES),
+                 "location": rng.choice(CITIES), "requirements": ", ".join(rng.sample(SKILLS, rng.randint(3, 6))),
+                 "is_active": True}
+                for _ in range(offset, min(jobs, offset + batch))
+            ])
+        await db.commit()
+
+
+async def naive_ranking_seconds(course_id: int) -> float:
+    """Parse and score every active job against one course in plain Python (what the index avoids per request)."""
+    from sqlalchemy import select
+
+    from app.database import SessionLocal
+    from app.models import Course, Job
+    from app.recommendations import course_terms, skill_terms
+
+    async with SessionLocal() as db:
+        course = (await db.execute(select(Course.title, Course.description).filter(Course.id == course_id))).first()
+        rows = (await db.execute(select(Job.id, Job.requirements).filter(Job.is_active == True))).all()
+    start = time.perf_counter()
+    terms = course_terms(course.title, course.description)
+    jobs = [(row.id, skill_terms(row.requirements)) for row in rows]
+    df = {}
+    for _, skills in jobs:
+        for skill in skills:
+            df[skill] = df.get(skill, 0) + 1
+    idf = {skill: math.log((1 + len(jobs)) / (1 + count)) + 1 for skill, count in df.items()}
+    query = {term: (1 + math.log(count)) * idf[term] for term, count in terms.items() if term in idf}
+    query_norm = math.sqrt(sum(weight ** 2 for weight in query.values()))
+    scores = []
+    for job_id, skills in jobs:
+        dot = sum(query.get(skill, 0.0) * idf[skill] for skill in skills)
+        if dot:
+            scores.append((dot / (math.sqrt(sum(idf[skill] ** 2 for skill in skills)) * query_norm), job_id))
+    scores.sort(reverse=True)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    await reset_schema()
+    await seed(args.jobs, args.courses, rng)
+
+    async with make_client() as client:
+        headers = await admin_headers(client)
+        start = time.perf_counter()
+        (await client.get("/candidates/1/recommended-jobs", headers=headers)).raise_for_status()
+        first = time.perf_counter() - start
+
+        # Every course once (cache misses), then random courses again (cache hits)
+        cold, warm = [], []
+        for candidate_id in range(2, args.courses + 1):
+            start = time.perf_counter()
+            (await client.get(f"/candidates/{candidate_id}/recommended-jobs", headers=headers)).raise_for_status()
+            cold.append(time.perf_counter() - start)
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = await client.get(f"/candidates/{rng.randint(1, args.courses)}/recommended-jobs", headers=headers)
+            warm.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    from app.recommendations import job_recommender
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "courses": args.courses,
+        "skills": len(job_recommender.index.skills),
+        "first_request_ms": round(first * 1000, 1),
+        "uncached_p50_ms": round(percentile(cold, 50) * 1000, 2),
+        "uncached_p95_ms": round(percentile(cold, 95) * 1000, 2),
+        "cached_p50_ms": round(percentile(warm, 50) * 1000, 2),
+        "cached_p95_ms": round(percentile(warm, 95) * 1000, 2),
+        "naive_python_ranking_ms": round(await naive_ranking_seconds(1) * 1000, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""Check read/write splitting against two local SQLite stand-ins.
+
+The "replica" is a separate, never-replicated SQLite file, so a read that
+finds a freshly written row must have been routed to the primary. Verifies
+that writes go to the primary, that the writing client's follow-up reads
+stick to the primary, and that other (or expired) clients read the replica.
+Exits with code 1 on any mismatch.
+
+    python -m benchmarks.replica_routing
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+# Configure both engines before anything imports app.database
+os.environ.setdefault("DATABASE_READ_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'codexa_bench_replica.db')}")
+os.environ.setdefault("REPLICA_STICKINESS_SECONDS", "1")
+
+from .common import admin_headers, make_client, reset_schema
+
+
+async def main():
+    from app.database import REPLICA_ENABLED, REPLICA_STICKINESS_SECONDS, STICKY_COOKIE, read_engine
+    from app.models import Base
+
+    if not REPLICA_ENABLED:
+        print("DATABASE_READ_URL must point at a different database than DATABASE_URL")
+        sys.exit(2)
+    await reset_schema()
+    async with read_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    failures = []
+
+    def check(name, response, expected_status):
+        ok = response.status_code == expected_status
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: {response.status_code} (expected {expected_status})")
+        if not ok:
+            failures.append(name)
+
+    async with make_client() as client:
+        headers = await admin_headers(client)
+        response = await client.post("/jobs/", headers=headers, json={
+            "title": "Replica Engineer", "company": "Bench Corp", "location": "Pune",
+            "requirements": "Python", "salary_range": "₹6-10 LPA",
+        })
+        check("write goes to primary", response, 200)
+        job_id = response.json()["id"]
+        if STICKY_COOKIE not in response.cookies:
+            print(f"FAIL write response sets {STICKY_COOKIE}")
+            failures.append("sticky cookie")
+
+        check("writer reads its own write", await client.get(f"/jobs/{job_id}"), 200)
+
+        async with make_client() as other:
+            check("other client reads replica", await other.get(f"/jobs/{job_id}"), 404)
+
+        await asyncio.sleep(REPLICA_STICKINESS_SECONDS + 0.2)
+        check("writer reads replica once stickiness expires", await client.get(f"/jobs/{job_id}"), 404)
+
+    if failures:
+        sys.exit(1)
+    print("Read/write routing behaves as expected")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
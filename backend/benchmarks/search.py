@@ -0,0 +1,73 @@
+"""Latency of GET /jobs/search against a large seeded job table.
+
+    python -m benchmarks.search --jobs 100000 --queries 500
+
+The first query builds the in-process index and is reported separately.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import insert
+
+from .common import make_client, percentile, reset_schema
+
+SKILLS = ["Python", "Django", "FastAPI", "SQL", "MySQL", "React", "Node.js", "AWS", "Docker", "Kubernetes",
+          "Java", "Spring", "Go", "Rust", "C++", "Pandas", "NumPy", "Machine Learning", "Power BI", "Excel"]
+TITLES = ["Developer", "Engineer", "Data Scientist", "Analyst", "Architect", "Intern", "Lead", "Consultant"]
+CITIES = ["Pune", "Mumbai", "Bangalore", "Hyderabad", "Chennai", "Delhi", "Nashik", "Remote"]
+COMPANIES = ["TCS", "Infosys", "HCL", "Cognizant", "Wipro", "Accenture", "Capgemini", "Tech Mahindra"]
+
+
+async def seed(jobs: int, rng: random.Random, batch: int = 10000):
+    from app.database import SessionLocal
+    from app.models import Job
+
+    async with SessionLocal() as db:
+        for offset in range(0, jobs, batch):
+            await db.execute(insert(Job), [
+                {"title": f"{rng.choice(SKILLS)} {rng.choice(TITLES)}", "company": rng.choice(COMPANIES),
+                 "location": rng.choice(CITIES), "description": "Long description " * 20,
+                 "requirements": ", ".join(rng.sample(SKILLS, 4)), "salary_range": "₹6-10 LPA", "is_active": True}
+                for _ in range(offset, min(jobs, offset + batch))
+            ])
+        await db.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    await reset_schema()
+    await seed(args.jobs, rng)
+
+    queries = [f"{rng.choice(SKILLS)} {rng.choice(CITIES)}" for _ in range(args.queries)]
+    async with make_client() as client:
+        start = time.perf_counter()
+        (await client.get("/jobs/search", params={"q": queries[0]})).raise_for_status()
+        warmup = time.perf_counter() - start
+
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            response = await client.get("/jobs/search", params={"q": query})
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "queries": args.queries,
+        "first_query_ms": round(warmup * 1000, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
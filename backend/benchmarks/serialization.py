@@ -0,0 +1,81 @@
+"""Serialization CPU and bytes on the wire for job list pages.
+
+Compares FastAPI's default response path (validate every ORM row into the
+response model, then encode with the stdlib json module), Pydantic's direct
+``dump_json``, and the orjson fast path in ``app.serialization``. Then
+reports body size and compression time for gzip and brotli.
+
+    python -m benchmarks.serialization --rows 100,1000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+
+def make_jobs(count: int):
+    from app.models import Job
+
+    start = datetime(2024, 1, 1)
+    return [
+        Job(id=i, title=f"Senior Python Engineer {i}", company=f"Company {i % 200}", location="Pune",
+            description="Build and operate data-heavy backend services. " * 20,
+            requirements="Python, FastAPI, SQLAlchemy, MySQL, Docker, AWS. " * 4,
+            salary_range="₹12-18 LPA", is_active=True, created_at=start + timedelta(seconds=i, microseconds=i))
+        for i in range(count)
+    ]
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100,1000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from app.compression import brotli, compress
+    from app.schemas import JobResponse
+    from app.serialization import dump_rows
+
+    adapter = TypeAdapter(List[JobResponse])
+
+    def fastapi_default(rows):
+        validated = adapter.validate_python(rows, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    results = {}
+    for count in [int(value) for value in args.rows.split(",")]:
+        rows = make_jobs(count)
+        body = dump_rows(rows, JobResponse)
+        assert json.loads(body) == json.loads(fastapi_default(rows)), "fast path output differs"
+        result = {
+            "serialize_ms": {
+                "fastapi_default": round(best_of(lambda: fastapi_default(rows), args.repeat) * 1000, 3),
+                "pydantic_dump_json": round(best_of(lambda: adapter.dump_json(rows), args.repeat) * 1000, 3),
+                "orjson_fast_path": round(best_of(lambda: dump_rows(rows, JobResponse), args.repeat) * 1000, 3),
+            },
+            "bytes": {"identity": len(body)},
+            "compress_ms": {},
+        }
+        for encoding in ("gzip", "br"):
+            if encoding == "br" and brotli is None:
+                continue
+            result["bytes"][encoding] = len(compress(body, encoding))
+            result["compress_ms"][encoding] = round(best_of(lambda: compress(body, encoding), args.repeat) * 1000, 3)
+        results[f"{count}_rows"] = result
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Listing/search indexes, candidates.course_id foreign key, dashboard counters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+candidates = sa.table("candidates", sa.column("course_id", sa.Integer), sa.column("status", sa.String))
+courses = sa.table("courses", sa.column("id", sa.Integer), sa.column("is_active", sa.Boolean))
+jobs = sa.table("jobs", sa.column("company", sa.String), sa.column("location", sa.String), sa.column("is_active", sa.Boolean))
+stat_counters = sa.table("stat_counters", sa.column("dimension", sa.String), sa.column("key", sa.String), sa.column("count", sa.Integer))
+
+
+def _count_into(dimension, key, table, *criteria):
+    """INSERT INTO stat_counters SELECT dimension, key, COUNT(*) FROM table WHERE criteria GROUP BY key."""
+    key = sa.cast(key, sa.String(255))
+    query = sa.select(sa.literal(dimension), key, sa.func.count()).select_from(table).where(*criteria).group_by(key)
+    op.execute(stat_counters.insert().from_select(["dimension", "key", "count"], query))
+
+
+def upgrade():
+    is_mysql = op.get_bind().dialect.name == "mysql"
+
+    # Keyset pagination on (created_at, id), see app/pagination.py
+    op.create_index("ix_courses_active_created_at_id", "courses", ["is_active", "created_at", "id"])
+    op.create_index("ix_candidates_created_at_id", "candidates", ["created_at", "id"])
+    op.create_index("ix_candidates_course_created_at_id", "candidates", ["course_id", "created_at", "id"])
+    op.create_index("ix_jobs_active_created_at_id", "jobs", ["is_active", "created_at", "id"])
+    if is_mysql:
+        op.create_index("ft_jobs_search", "jobs", ["title", "company", "location", "requirements"], mysql_prefix="FULLTEXT")
+
+    # Orphaned course ids would violate the new constraint
+    op.execute(
+        candidates.update()
+        .where(candidates.c.course_id.isnot(None), candidates.c.course_id.notin_(sa.select(courses.c.id)))
+        .values(course_id=None)
+    )
+    with op.batch_alter_table("candidates") as batch:
+        batch.create_foreign_key("fk_candidates_course_id_courses", "courses", ["course_id"], ["id"])
+
+    op.create_table(
+        "stat_counters",
+        sa.Column("dimension", sa.String(50), primary_key=True),
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    # Same counters as app.stats.rebuild_stats, computed in SQL so the migration does not depend on app code
+    _count_into("totals", sa.literal("candidates"), candidates)
+    _count_into("totals", sa.literal("jobs"), jobs)
+    _count_into("totals", sa.literal("active_jobs"), jobs, jobs.c.is_active == sa.true())
+    _count_into("totals", sa.literal("courses"), courses)
+    _count_into("totals", sa.literal("active_courses"), courses, courses.c.is_active == sa.true())
+    _count_into("candidates_by_status", candidates.c.status, candidates, candidates.c.status.isnot(None))
+    _count_into("candidates_by_course", candidates.c.course_id, candidates, candidates.c.course_id.isnot(None))
+    _count_into("active_jobs_by_company", jobs.c.company, jobs, jobs.c.is_active == sa.true())
+    _count_into("active_jobs_by_location", jobs.c.location, jobs, jobs.c.is_active == sa.true(), jobs.c.location.isnot(None))
+
+
+def downgrade():
+    op.drop_table("stat_counters")
+    with op.batch_alter_table("candidates") as batch:
+        batch.drop_constraint("fk_candidates_course_id_courses", type_="foreignkey")
+    if op.get_bind().dialect.name == "mysql":
+        op.drop_index("ft_jobs_search", table_name="jobs")
+    op.drop_index("ix_jobs_active_created_at_id", table_name="jobs")
+    op.drop_index("ix_candidates_course_created_at_id", table_name="candidates")
+    op.drop_index("ix_candidates_created_at_id", table_name="candidates")
+    op.drop_index("ix_courses_active_created_at_id", table_name="courses")
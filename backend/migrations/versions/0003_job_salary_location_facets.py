@@ -0,0 +1,66 @@
+"""Structured job salary bounds and normalized company/location keys
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Salary parsing lives in Python, so the backfill reuses the application's parser
+from app.facets import backfill_rows
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+jobs = sa.table(
+    "jobs",
+    sa.column("id", sa.Integer), sa.column("company", sa.String), sa.column("location", sa.String),
+    sa.column("salary_range", sa.String), sa.column("company_key", sa.String), sa.column("location_key", sa.String),
+    sa.column("salary_min", sa.Integer), sa.column("salary_max", sa.Integer),
+)
+
+
+def upgrade():
+    op.add_column("jobs", sa.Column("company_key", sa.String(255), nullable=True))
+    op.add_column("jobs", sa.Column("location_key", sa.String(255), nullable=True))
+    op.add_column("jobs", sa.Column("salary_min", sa.Integer(), nullable=True))
+    op.add_column("jobs", sa.Column("salary_max", sa.Integer(), nullable=True))
+
+    # Backfill in id order, one batch per statement, so large tables are not read at once
+    bind = op.get_bind()
+    stmt = (
+        jobs.update()
+        .where(jobs.c.id == sa.bindparam("job_id"))
+        .values({name: sa.bindparam(name) for name in ("company_key", "location_key", "salary_min", "salary_max")})
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(jobs.c.id, jobs.c.company, jobs.c.location, jobs.c.salary_range)
+            .where(jobs.c.id > last_id).order_by(jobs.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(stmt, backfill_rows(rows))
+        last_id = rows[-1][0]
+
+    op.create_index("ix_jobs_active_location_key_created_at_id", "jobs", ["is_active", "location_key", "created_at", "id"])
+    op.create_index("ix_jobs_active_company_key_created_at_id", "jobs", ["is_active", "company_key", "created_at", "id"])
+    op.create_index("ix_jobs_active_salary_max", "jobs", ["is_active", "salary_max"])
+
+
+def downgrade():
+    op.drop_index("ix_jobs_active_salary_max", table_name="jobs")
+    op.drop_index("ix_jobs_active_company_key_created_at_id", table_name="jobs")
+    op.drop_index("ix_jobs_active_location_key_created_at_id", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("salary_max")
+        batch.drop_column("salary_min")
+        batch.drop_column("location_key")
+        batch.drop_column("company_key")
@@ -0,0 +1,35 @@
+"""Audit trail of API writes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audit_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("actor_id", sa.Integer(), nullable=True),
+        sa.Column("actor", sa.String(100), nullable=True),
+        sa.Column("action", sa.String(20), nullable=False),
+        sa.Column("entity", sa.String(50), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=True),
+        sa.Column("changes", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_audit_events_created_at_id", "audit_events", ["created_at", "id"])
+    op.create_index("ix_audit_events_entity_created_at_id", "audit_events", ["entity", "entity_id", "created_at", "id"])
+    op.create_index("ix_audit_events_actor_created_at_id", "audit_events", ["actor_id", "created_at", "id"])
+
+
+def downgrade():
+    op.drop_table("audit_events")
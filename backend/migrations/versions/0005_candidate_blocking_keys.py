@@ -0,0 +1,59 @@
+"""Normalized candidate name and phone keys for duplicate detection
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Normalization lives in Python, so the backfill reuses the application's key functions
+from app.dedup import backfill_rows
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+candidates = sa.table(
+    "candidates",
+    sa.column("id", sa.Integer), sa.column("name", sa.String), sa.column("phone", sa.String),
+    sa.column("name_key", sa.String), sa.column("phone_key", sa.String),
+)
+
+
+def upgrade():
+    op.add_column("candidates", sa.Column("name_key", sa.String(255), nullable=True))
+    op.add_column("candidates", sa.Column("phone_key", sa.String(20), nullable=True))
+
+    # Backfill in id order, one batch per statement, so large tables are not read at once
+    bind = op.get_bind()
+    stmt = (
+        candidates.update()
+        .where(candidates.c.id == sa.bindparam("candidate_id"))
+        .values({name: sa.bindparam(name) for name in ("name_key", "phone_key")})
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(candidates.c.id, candidates.c.name, candidates.c.phone)
+            .where(candidates.c.id > last_id).order_by(candidates.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(stmt, backfill_rows(rows))
+        last_id = rows[-1][0]
+
+    op.create_index("ix_candidates_name_key", "candidates", ["name_key"])
+    op.create_index("ix_candidates_phone_key", "candidates", ["phone_key"])
+
+
+def downgrade():
+    op.drop_index("ix_candidates_phone_key", table_name="candidates")
+    op.drop_index("ix_candidates_name_key", table_name="candidates")
+    with op.batch_alter_table("candidates") as batch:
+        batch.drop_column("phone_key")
+        batch.drop_column("name_key")
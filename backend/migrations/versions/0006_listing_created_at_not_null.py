@@ -0,0 +1,37 @@
+"""Non-null created_at on keyset-paginated tables
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Keyset pagination orders and seeks on (created_at, id); a NULL created_at cannot be encoded in a
+# cursor and drops out of every "(created_at, id) < cursor" comparison (see app/pagination.py)
+TABLES = ("courses", "candidates", "jobs")
+
+
+def upgrade():
+    for name in TABLES:
+        table = sa.table(name, sa.column("created_at", sa.DateTime), sa.column("updated_at", sa.DateTime))
+        # The last update is the closest known bound on when an undated row was created
+        op.execute(
+            table.update()
+            .where(table.c.created_at.is_(None))
+            .values(created_at=sa.func.coalesce(table.c.updated_at, sa.func.current_timestamp()))
+        )
+        with op.batch_alter_table(name) as batch:
+            batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for name in reversed(TABLES):
+        with op.batch_alter_table(name) as batch:
+            batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=True)
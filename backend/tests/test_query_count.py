@@ -0,0 +1,13 @@
+import asyncio
+
+from benchmarks.query_count import measure
+
+PAGE_SIZES = [10, 50, 100, 500]
+
+
+def test_embedded_relations_do_not_add_queries_per_row():
+    results = asyncio.run(measure(PAGE_SIZES))
+
+    for name, counts in results.items():
+        assert set(counts) == set(PAGE_SIZES), name
+        assert len(set(counts.values())) == 1, f"{name}: {counts}"